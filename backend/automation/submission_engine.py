@@ -7,13 +7,32 @@ from typing import Dict, Any
 import structlog
 
 from .openmanus_client import OpenManusClient
-from ..database import get_supabase_client
+from ..database import get_supabase_client, is_missing_column
 from ..security.vault import decrypt_credentials
-from ..security.audit import sign_audit_log
+from ..security.audit import sign_audit_log, SIGNATURE_ALG
 
 logger = structlog.get_logger()
 
 
+def _insert_audit_log(supabase, audit_data: Dict[str, Any]) -> None:
+    """
+    Sign and insert an audit log.
+
+    Falls back to a legacy HMAC-SHA256 row without signature_alg when the
+    column is missing (code deployed ahead of migration 15).
+    """
+    audit_data["confirmation_hash"] = sign_audit_log(audit_data)
+    try:
+        supabase.table("audit_logs").insert(audit_data).execute()
+    except Exception as e:
+        if not is_missing_column(e):
+            raise
+        logger.warning("audit_logs.signature_alg missing; writing legacy signature", error=str(e))
+        legacy = {k: v for k, v in audit_data.items() if k not in ("signature_alg", "confirmation_hash")}
+        legacy["confirmation_hash"] = sign_audit_log(legacy)
+        supabase.table("audit_logs").insert(legacy).execute()
+
+
 async def execute_submission(
     submission_id: str,
     run_id: str,
@@ -143,6 +162,7 @@ async def execute_submission(
                 "portal": portal,
                 "action": "SUBMIT" if not dry_run else "DRY_RUN",
                 "status": "CONFIRMED",
+                "signature_alg": SIGNATURE_ALG,
                 "receipt_id": result.get("receipt_id"),
                 "evidence_urls": result.get("screenshots", []),
                 "metadata": {
@@ -153,8 +173,7 @@ async def execute_submission(
                     "evidence_dir": result.get("evidence_dir"),
                 }
             }
-            audit_data["confirmation_hash"] = sign_audit_log(audit_data)
-            supabase.table("audit_logs").insert(audit_data).execute()
+            _insert_audit_log(supabase, audit_data)
 
             logger.info(
                 "Submission completed successfully",
@@ -170,6 +189,7 @@ async def execute_submission(
                 "portal": portal,
                 "action": "SUBMIT_FAILED",
                 "status": "FAILED",
+                "signature_alg": SIGNATURE_ALG,
                 "metadata": {
                     "run_id": run_id,
                     "error": result.get("error"),
@@ -177,8 +197,7 @@ async def execute_submission(
                     "duration_ms": duration_ms,
                 }
             }
-            audit_data["confirmation_hash"] = sign_audit_log(audit_data)
-            supabase.table("audit_logs").insert(audit_data).execute()
+            _insert_audit_log(supabase, audit_data)
 
             logger.error(
                 "Submission failed",
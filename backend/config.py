@@ -2,11 +2,13 @@
 Procura Backend Configuration
 Loads all environment variables and provides type-safe access
 """
+import logging
 import os
 from functools import lru_cache
 from typing import Optional
 from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+import structlog
 
 
 class Settings(BaseSettings):
@@ -145,3 +147,16 @@ def get_settings() -> Settings:
 # Convenience alias
 settings = get_settings()
 
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Apply LOG_LEVEL to structlog.
+
+    With a filtering bound logger, calls below the level are no-op methods,
+    so hot-path ``logger.info(...)`` calls skip the processor chain entirely.
+    """
+    name = (level or settings.LOG_LEVEL or "INFO").upper()
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, name, logging.INFO)),
+        cache_logger_on_first_use=True,
+    )
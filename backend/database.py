@@ -2,6 +2,7 @@
 Procura Database Client
 Supabase client initialization and helper functions
 """
+import asyncio
 from functools import lru_cache
 from typing import Any, Optional
 from supabase import create_client, Client
@@ -57,11 +58,31 @@ def get_supabase_client() -> Client:
     raise ValueError("Supabase keys not configured (set SUPABASE_ANON_KEY or SUPABASE_SERVICE_ROLE_KEY)")
 
 
+async def execute_async(query: Any) -> Any:
+    """
+    Run a query builder's blocking ``execute()`` in a worker thread.
+
+    supabase-py's sync client blocks the event loop for the whole HTTP round-trip;
+    use this from async code (Celery tasks, connector pipelines) so concurrent
+    work started with ``asyncio.gather`` actually overlaps.
+    """
+    return await asyncio.to_thread(query.execute)
+
+
 def get_db() -> Client:
     """Dependency for FastAPI routes"""
     return get_supabase_client()
 
 
+def get_optional_db() -> Optional[Client]:
+    """Like ``get_db``, but None when the client can't be built (lets /health report it)"""
+    try:
+        return get_supabase_client()
+    except Exception as e:
+        logger.warning("Supabase client unavailable", error=str(e)[:200])
+        return None
+
+
 def get_supabase_user_client(access_token: str) -> Client:
     """
     Create a Supabase client scoped to an authenticated user.
@@ -77,6 +98,26 @@ def get_supabase_user_client(access_token: str) -> Client:
     return client
 
 
+# PostgREST (schema cache) / PostgreSQL codes for a column that doesn't exist
+_UNDEFINED_COLUMN_CODES = frozenset({"PGRST204", "42703"})
+
+
+def is_missing_column(exc: Exception) -> bool:
+    """True if a write failed because a column isn't there (migration not applied yet)"""
+    return getattr(exc, "code", None) in _UNDEFINED_COLUMN_CODES
+
+
+# PostgREST / PostgreSQL codes for an RPC whose function isn't deployed
+_MISSING_FUNCTION_CODES = frozenset({"PGRST202", "42883"})
+
+
+def is_missing_function(exc: Exception) -> bool:
+    """True if an RPC failed only because the database function doesn't exist"""
+    if getattr(exc, "code", None) in _MISSING_FUNCTION_CODES:
+        return True
+    return "Could not find the function" in str(getattr(exc, "message", None) or exc)
+
+
 class DatabaseHelper:
     """Helper class for common database operations"""
     
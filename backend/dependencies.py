@@ -4,7 +4,7 @@ Authentication middleware and common dependencies
 """
 from typing import Optional
 from datetime import datetime, timezone
-from collections import defaultdict
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from supabase import Client
@@ -130,26 +130,55 @@ require_admin = require_role(["admin"])
 require_officer = require_role(["admin", "contract_officer"])
 
 
+_RATE_LIMIT_SHARDS = 16  # power of two: shard index is a mask of the key hash
+_RATE_LIMIT_SWEEP_EVERY = 1024  # checks between sweeps of one shard
+
+
 class RateLimiter:
-    """Sliding window in-memory rate limiter. Use Redis for multi-process production."""
+    """
+    Token-bucket in-memory rate limiter. Use Redis for multi-process production.
+
+    Each identifier holds ``(tokens, last_refill)``: up to ``requests_per_minute``
+    tokens, refilled continuously at ``requests_per_minute / 60`` per second.
+    Buckets are spread over ``_RATE_LIMIT_SHARDS`` dicts so idle keys can be
+    swept one shard at a time instead of walking every key in one pass.
+    """
 
     def __init__(self, requests_per_minute: int = 100):
         self.requests_per_minute = requests_per_minute
-        self._requests: dict[str, list[float]] = defaultdict(list)
+        self._refill_per_second = requests_per_minute / 60.0
+        self._shards: list[dict[str, tuple[float, float]]] = [
+            {} for _ in range(_RATE_LIMIT_SHARDS)
+        ]
+        self._checks = 0
 
-    async def check(self, identifier: str) -> bool:
-        now = datetime.now(timezone.utc).timestamp()
-        window_start = now - 60.0
-
-        # Prune expired entries
-        timestamps = self._requests[identifier]
-        self._requests[identifier] = [t for t in timestamps if t > window_start]
+    def _shard_for(self, identifier: str) -> dict[str, tuple[float, float]]:
+        return self._shards[hash(identifier) & (_RATE_LIMIT_SHARDS - 1)]
 
-        if len(self._requests[identifier]) >= self.requests_per_minute:
-            return False
-
-        self._requests[identifier].append(now)
-        return True
+    async def check(self, identifier: str) -> bool:
+        # No await below, so the read-modify-write is atomic on the event loop.
+        now = time.monotonic()
+        shard = self._shard_for(identifier)
+        capacity = self.requests_per_minute
+        tokens, last_refill = shard.get(identifier, (capacity, now))
+        tokens = min(capacity, tokens + (now - last_refill) * self._refill_per_second)
+
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        shard[identifier] = (tokens, now)
+
+        self._checks += 1
+        if self._checks % _RATE_LIMIT_SWEEP_EVERY == 0:
+            sweep_index = (self._checks // _RATE_LIMIT_SWEEP_EVERY) & (_RATE_LIMIT_SHARDS - 1)
+            self._sweep(self._shards[sweep_index], now)
+        return allowed
+
+    @staticmethod
+    def _sweep(shard: dict[str, tuple[float, float]], now: float) -> None:
+        """Drop buckets idle for a full minute: they have refilled, same as a missing key."""
+        for identifier in [k for k, (_, last) in shard.items() if now - last >= 60.0]:
+            del shard[identifier]
 
 
 rate_limiter = RateLimiter(settings.RATE_LIMIT_PER_MINUTE)
@@ -1,18 +1,23 @@
 """
 Procura Backend - Main FastAPI Application
 """
+import asyncio
+import json
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status
+from typing import Optional
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from supabase import Client
 import structlog
 import uvicorn
 
-from .config import settings as app_settings
+from .config import configure_logging, settings as app_settings
+from .database import get_optional_db
 
 # Initialize Sentry when DSN is configured (optional)
 if app_settings.SENTRY_DSN:
@@ -33,6 +38,9 @@ from .routers import documents, follow_ups, correspondence
 from .routers import company_profile
 from .routers import market_intel
 
+# After the imports (module loggers are lazy proxies, so they pick this up on first use)
+configure_logging()
+
 logger = structlog.get_logger()
 
 # Celery is activated only when a remote Redis URL is configured.
@@ -105,6 +113,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if app_settings.DEBUG else None,
     redoc_url="/redoc" if app_settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -286,54 +295,59 @@ app.include_router(
 # ROOT ENDPOINTS
 # ===========================================
 
+# Static for the life of the process; serialized once at import
+_ROOT_BODY = json.dumps({
+    "name": "Procura Ops API",
+    "version": "1.0.0",
+    "status": "healthy",
+    "environment": app_settings.ENVIRONMENT
+}, separators=(",", ":")).encode()
+
+
 @app.get("/", tags=["Health"])
 async def root():
     """API root - health check"""
-    return {
-        "name": "Procura Ops API",
-        "version": "1.0.0",
-        "status": "healthy",
-        "environment": app_settings.ENVIRONMENT
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+
+def _probe_database(db: Optional[Client]) -> None:
+    if db is None:
+        raise RuntimeError("Supabase client not configured")
+    db.table("profiles").select("id").limit(1).execute()
+
+
+def _probe_redis(redis_url: str) -> None:
+    import redis
+    redis.from_url(redis_url, socket_timeout=2).ping()
 
 
 @app.get("/health", tags=["Health"])
-async def health_check():
+async def health_check(db: Optional[Client] = Depends(get_optional_db)):
     """Detailed health check with actual connection verification"""
-    from .database import get_supabase_client
-
     health_status = {
         "status": "healthy",
         "checks": {},
         "environment": app_settings.ENVIRONMENT
     }
+    failed = "unavailable" if app_settings.is_production else "error: connection failed"
 
-    # Check Supabase connection
-    try:
-        db = get_supabase_client()
-        db.table("profiles").select("id").limit(1).execute()
-        health_status["checks"]["database"] = "connected"
-    except Exception:
-        health_status["checks"]["database"] = (
-            "unavailable" if app_settings.is_production else "error: connection failed"
-        )
-        health_status["status"] = "degraded"
+    # Both probes are blocking round-trips; run them side by side so the
+    # check takes max(db, redis) rather than db + redis.
+    probes = {"database": asyncio.to_thread(_probe_database, db)}
 
     # Check Redis whenever a redis:// URL is configured.
     redis_url = (app_settings.REDIS_URL or "").strip()
     if redis_url and (redis_url.startswith("redis://") or redis_url.startswith("rediss://")):
-        try:
-            import redis
-            r = redis.from_url(redis_url, socket_timeout=2)
-            r.ping()
-            health_status["checks"]["redis"] = "connected"
-        except Exception:
-            health_status["checks"]["redis"] = (
-                "unavailable" if app_settings.is_production else "error: connection failed"
-            )
+        probes["redis"] = asyncio.to_thread(_probe_redis, redis_url)
+
+    results = await asyncio.gather(*probes.values(), return_exceptions=True)
+    for name, result in zip(probes, results):
+        if isinstance(result, Exception):
+            health_status["checks"][name] = failed
             health_status["status"] = "degraded"
-    else:
-        health_status["checks"]["redis"] = "not configured (optional)"
+        else:
+            health_status["checks"][name] = "connected"
+    health_status["checks"].setdefault("redis", "not configured (optional)")
 
     return health_status
 
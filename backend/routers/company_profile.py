@@ -125,6 +125,9 @@ async def save_profile(
             detail="Failed to save company profile",
         )
 
+    from ..workflows.pipeline import invalidate_caches
+    invalidate_caches()
+
     logger.info("Company profile saved", user_id=user["id"])
     return profile
 
@@ -159,4 +162,7 @@ async def update_profile(
             detail="Failed to update company profile",
         )
 
+    from ..workflows.pipeline import invalidate_caches
+    invalidate_caches()
+
     return validated
@@ -65,6 +65,7 @@ async def _auto_qualify_and_notify(new_opp_ids: list[str], triggered_by_user_id:
     # Load all new opps in one query
     rows = admin_supabase.table("opportunities").select("*").in_("id", new_opp_ids).execute()
     opps = rows.data or []
+    pipeline_items: list[tuple[dict, int]] = []
 
     for opp in opps:
         try:
@@ -86,48 +87,57 @@ async def _auto_qualify_and_notify(new_opp_ids: list[str], triggered_by_user_id:
             if fit >= _NOTIFY_FIT_THRESHOLD:
                 _send_opportunity_notifications(admin_supabase, opp, fit)
 
-            # Run pipeline orchestrator (may auto-create submission in supervised/autonomous modes)
-            try:
-                from ..workflows.pipeline import run_pipeline
-                updated_opp = {**opp, "fit_score": fit}
-                await run_pipeline(updated_opp, fit, triggered_by_user_id=triggered_by_user_id)
-            except Exception as pe:
-                logger.warning("Pipeline orchestration failed", opp_id=opp["id"], error=str(pe)[:200])
-
+            pipeline_items.append(({**opp, "fit_score": fit}, fit))
             logger.info("Auto-qualified opportunity", opp_id=opp["id"], fit=fit)
 
         except Exception as e:
             logger.warning("Auto-qualification failed for opportunity", opp_id=opp.get("id"), error=str(e)[:200])
 
+    # Run pipeline orchestrator (may auto-create submissions in supervised/autonomous modes)
+    if pipeline_items:
+        from ..workflows.pipeline import run_pipeline_batch
+        await run_pipeline_batch(pipeline_items, triggered_by_user_id=triggered_by_user_id)
+
+
+def _build_opportunity_notifications(recipient_ids: list[str], opp: dict, fit_score: int) -> list[dict]:
+    """Notification rows announcing a high-fit opportunity to each recipient."""
+    due_date = opp.get("due_date", "TBD")
+    value = opp.get("estimated_value")
+    value_str = f" · ${value:,.0f}" if value else ""
+    priority = "urgent" if fit_score >= 90 else ("high" if fit_score >= 80 else "normal")
+
+    return [
+        {
+            "user_id": user_id,
+            "title": f"High-Fit Opportunity: {opp.get('title', 'New Opportunity')}",
+            "body": (
+                f"Fit Score: {fit_score}/100 · {opp.get('agency', 'Unknown Agency')}"
+                f"{value_str} · Due: {due_date}"
+            ),
+            "type": "opportunity",
+            "priority": priority,
+            "entity_type": "opportunity",
+            "entity_id": opp["id"],
+            "action_url": f"/dashboard",
+        }
+        for user_id in recipient_ids
+    ]
+
+
+def _notification_recipient_ids(supabase) -> list[str]:
+    """IDs of all admin/officer users."""
+    users = supabase.table("profiles").select("id").in_("role", ["admin", "contract_officer"]).execute()
+    return [u["id"] for u in users.data or []]
+
 
 def _send_opportunity_notifications(supabase, opp: dict, fit_score: int) -> None:
     """Insert a notification row for every admin/officer user."""
     try:
-        users = supabase.table("profiles").select("id").in_("role", ["admin", "contract_officer"]).execute()
-        if not users.data:
+        recipient_ids = _notification_recipient_ids(supabase)
+        if not recipient_ids:
             return
 
-        due_date = opp.get("due_date", "TBD")
-        value = opp.get("estimated_value")
-        value_str = f" · ${value:,.0f}" if value else ""
-        priority = "urgent" if fit_score >= 90 else ("high" if fit_score >= 80 else "normal")
-
-        notifications = [
-            {
-                "user_id": u["id"],
-                "title": f"High-Fit Opportunity: {opp.get('title', 'New Opportunity')}",
-                "body": (
-                    f"Fit Score: {fit_score}/100 · {opp.get('agency', 'Unknown Agency')}"
-                    f"{value_str} · Due: {due_date}"
-                ),
-                "type": "opportunity",
-                "priority": priority,
-                "entity_type": "opportunity",
-                "entity_id": opp["id"],
-                "action_url": f"/dashboard",
-            }
-            for u in users.data
-        ]
+        notifications = _build_opportunity_notifications(recipient_ids, opp, fit_score)
         supabase.table("notifications").insert(notifications).execute()
         logger.info("Notifications sent", opp_id=opp["id"], fit=fit_score, recipients=len(notifications))
     except Exception as e:
@@ -382,7 +392,8 @@ async def trigger_sync(
 
             try:
                 # Fetch + normalize opportunities from the external source
-                async with connector_class(api_key=resolved_key) as connector:
+                connector = connector_class(api_key=resolved_key)
+                async with connector:
                     result = await connector.run_discovery(since)
 
                 opps = result.get("opportunities") or []
@@ -402,14 +413,14 @@ async def trigger_sync(
 
                     # Batch upsert by external_ref. Prefer service-role client to bypass RLS.
                     try:
-                        admin_supabase.table("opportunities").upsert(opps, on_conflict="external_ref").execute()
+                        await connector.persist_bulk(admin_supabase, opps)
                     except Exception as upsert_error:
                         logger.warning(
                             "Service-role upsert failed, retrying with request-scoped client",
                             connector=name,
                             error=str(upsert_error),
                         )
-                        supabase.table("opportunities").upsert(opps, on_conflict="external_ref").execute()
+                        await connector.persist_bulk(supabase, opps)
 
                     # Collect IDs of genuinely new opportunities for background qualification
                     new_refs = [r for r in ext_refs if r not in existing_refs]
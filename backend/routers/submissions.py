@@ -13,7 +13,7 @@ import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File, status
 from supabase import Client
 import structlog
 
@@ -916,10 +916,21 @@ class GenerateProposalRequest(BaseModel):
     provider: Optional[str] = None
 
 
+def _persist_section(supabase: Client, submission_id: str, sections: dict) -> None:
+    """Best-effort write of proposal_sections; runs after the response is sent."""
+    try:
+        supabase.table("submissions").update(
+            {"proposal_sections": sections}
+        ).eq("id", submission_id).execute()
+    except Exception:
+        pass  # column may not exist; content was already returned to frontend
+
+
 @router.post("/{submission_id}/generate-section")
 async def generate_proposal_section(
     submission_id: str,
     req: GenerateSectionRequest,
+    background_tasks: BackgroundTasks,
     supabase: Client = Depends(get_request_supabase),
     user: dict = Depends(get_current_user),
 ):
@@ -970,16 +981,11 @@ async def generate_proposal_section(
             detail=f"AI generation failed: {str(e)[:200]}",
         )
 
-    # Persist the generated section into submissions.proposal_sections (JSONB column).
-    # If the column doesn't exist the update will fail silently — we still return the content.
-    try:
-        existing_sections = submission.data.get("proposal_sections") or {}
-        existing_sections[req.section] = {"content": content, "status": "generated"}
-        supabase.table("submissions").update(
-            {"proposal_sections": existing_sections}
-        ).eq("id", submission_id).execute()
-    except Exception:
-        pass  # column may not exist; content is still returned to frontend
+    # Persist the generated section into submissions.proposal_sections (JSONB column)
+    # after the response is sent — the write is best-effort and shouldn't add latency.
+    existing_sections = submission.data.get("proposal_sections") or {}
+    existing_sections[req.section] = {"content": content, "status": "generated"}
+    background_tasks.add_task(_persist_section, supabase, submission_id, existing_sections)
 
     logger.info("Proposal section generated", submission_id=submission_id, section=req.section)
     return {"section": req.section, "content": content, "status": "generated"}
@@ -2,6 +2,8 @@
 Base Connector
 Abstract base class for all data source connectors
 """
+import asyncio
+import time
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone
@@ -9,8 +11,24 @@ import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 import structlog
 
+from ..database import is_missing_function
+
 logger = structlog.get_logger()
 
+# Columns bulk_upsert_opportunities writes (migration 16). The table-upsert
+# fallback is projected onto the same list so both paths persist the same data.
+_PERSISTED_COLUMNS = (
+    "external_ref", "source", "title", "agency", "description", "naics_code", "set_aside",
+    "posted_date", "due_date", "estimated_value", "raw_data",
+)
+
+
+def first_code(value: Any) -> Optional[str]:
+    """Coerce a code field that may be a scalar or a list (NAICS, CFDA) to a single string"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return str(value) if value else None
+
 
 class BaseConnector(ABC):
     """Abstract base class for discovery connectors"""
@@ -66,8 +84,52 @@ class BaseConnector(ABC):
         response.raise_for_status()
         return response
     
+    async def persist_bulk(self, supabase: Any, opportunities: List[Dict], chunk_size: int = 500) -> List[Dict]:
+        """
+        Upsert normalized opportunities keyed on external_ref.
+
+        One request per chunk instead of one per record; chunks run concurrently
+        (the Supabase client is sync, so each chunk goes to a worker thread).
+        Uses the bulk_upsert_opportunities RPC so the insert-or-update is atomic;
+        falls back to a PostgREST upsert if the function isn't deployed yet.
+        Only the columns the RPC writes (``_PERSISTED_COLUMNS``) are sent.
+
+        Returns ``{"inserted": bool, "opportunity": row}`` for every written row.
+        """
+        # A batch can't touch the same external_ref twice (ON CONFLICT DO UPDATE
+        # rejects it), and rows without one would fail the NOT NULL constraint
+        # for the whole chunk. Last record wins, as with per-record upserts.
+        by_ref = {opp["external_ref"]: opp for opp in opportunities if opp.get("external_ref")}
+        opportunities = [
+            {col: opp[col] for col in _PERSISTED_COLUMNS if col in opp}
+            for opp in by_ref.values()
+        ]
+        if not opportunities:
+            return []
+
+        def _upsert(chunk: List[Dict]) -> List[Dict]:
+            try:
+                response = supabase.rpc("bulk_upsert_opportunities", {"p": chunk}).execute()
+                return response.data or []
+            except Exception as e:
+                if not is_missing_function(e):
+                    raise
+                logger.warning("bulk_upsert_opportunities RPC missing; using table upsert", error=str(e)[:200])
+            response = supabase.table("opportunities").upsert(chunk, on_conflict="external_ref").execute()
+            # Inserted rows have created_at == updated_at; the BEFORE UPDATE
+            # trigger bumps updated_at when the upsert hits an existing row.
+            return [
+                {"inserted": row.get("created_at") == row.get("updated_at"), "opportunity": row}
+                for row in response.data or []
+            ]
+
+        chunks = [opportunities[i:i + chunk_size] for i in range(0, len(opportunities), chunk_size)]
+        results = await asyncio.gather(*[asyncio.to_thread(_upsert, chunk) for chunk in chunks])
+        return [row for rows in results for row in rows]
+
     async def run_discovery(self, since: Optional[datetime] = None) -> Dict[str, Any]:
         """Run full discovery process"""
+        t0 = time.monotonic()
         start_time = datetime.now(timezone.utc)
         result = {
             "connector": self.name,
@@ -97,13 +159,14 @@ class BaseConnector(ABC):
                     logger.warning("Failed to normalize opportunity", error=str(e))
                     result["errors"].append(str(e))
             
-            result["end_time"] = datetime.now(timezone.utc)
             result["success"] = True
             
         except Exception as e:
             logger.error("Discovery failed", connector=self.name, error=str(e))
-            result["end_time"] = datetime.now(timezone.utc)
             result["success"] = False
             result["errors"].append(str(e))
         
+        # Duration from the monotonic clock; end_time is for the audit trail only
+        result["duration_s"] = time.monotonic() - t0
+        result["end_time"] = datetime.now(timezone.utc)
         return result
@@ -5,9 +5,8 @@ Fetches federal contract opportunities from GovCon API
 from typing import List, Dict, Optional
 from datetime import datetime, date, timedelta, timezone
 import structlog
-import httpx
 
-from .base import BaseConnector
+from .base import BaseConnector, first_code
 
 logger = structlog.get_logger()
 
@@ -19,9 +18,16 @@ class GovConAPIConnector(BaseConnector):
     source = "govcon"
     # GovCon API base URL (see docs: https://govconapi.com/docs)
     base_url = "https://govconapi.com/api/v1"
+    # "Today" for the current discovery run, set once in fetch_opportunities
+    # so normalize() doesn't hit the clock for every record.
+    _today_date: Optional[date] = None
+    _today: Optional[str] = None
     
     async def fetch_opportunities(self, since: Optional[datetime] = None) -> List[Dict]:
         """Fetch opportunities from GovCon API"""
+        self._today_date = datetime.now(timezone.utc).date()
+        self._today = self._today_date.strftime("%Y-%m-%d")
+
         # Free tier often caps to 50; paid tiers support higher limits.
         limit = int(self.config.get("limit") or 50)
         offset = int(self.config.get("offset") or 0)
@@ -41,20 +47,15 @@ class GovConAPIConnector(BaseConnector):
             params["posted_after"] = since.strftime("%Y-%m-%d")
 
         headers = self.get_headers()
-        try:
-            response = await self.client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            if since and e.response is not None and e.response.status_code in (400, 403, 422):
-                # Likely rejected filter on this plan; retry once without date filter.
-                logger.warning(
-                    "GovCon API rejected date filter; retrying without posted_after",
-                    status_code=e.response.status_code,
-                )
-                response = await self.client.get(url, params=base_params, headers=headers)
-                response.raise_for_status()
-            else:
-                raise
+        response = await self.client.get(url, params=params, headers=headers)
+        if since and response.status_code in (400, 403, 422):
+            # Likely rejected filter on this plan; retry once without date filter.
+            logger.warning(
+                "GovCon API rejected date filter; retrying without posted_after",
+                status_code=response.status_code,
+            )
+            response = await self.client.get(url, params=base_params, headers=headers)
+        response.raise_for_status()
 
         data = response.json()
         opportunities = data.get("data", [])
@@ -86,8 +87,12 @@ class GovConAPIConnector(BaseConnector):
         # Required by schema: posted_date and due_date must be non-null.
         # If the source record doesn't include these, fall back to "today"
         # and mark the raw payload so the UI can show "TBD" / "assumed".
-        today_date = datetime.now(timezone.utc).date()
-        today = today_date.strftime("%Y-%m-%d")
+        today_date = self._today_date
+        today = self._today
+        if today_date is None or today is None:
+            # normalize() called outside a discovery run
+            today_date = datetime.now(timezone.utc).date()
+            today = today_date.strftime("%Y-%m-%d")
         if not posted_date:
             posted_date = today
         if not due_date:
@@ -105,11 +110,7 @@ class GovConAPIConnector(BaseConnector):
             raw["_due_date_missing"] = True
             raw["_due_date_assumed"] = due_date
 
-        naics = raw.get("naics") or raw.get("naics_code") or raw.get("naicsCode")
-        if isinstance(naics, list):
-            naics_code = str(naics[0]) if naics else None
-        else:
-            naics_code = str(naics) if naics else None
+        naics_code = first_code(raw.get("naics") or raw.get("naics_code") or raw.get("naicsCode"))
 
         return {
             "external_ref": raw.get("solicitation_number") or raw.get("notice_id") or raw.get("id"),
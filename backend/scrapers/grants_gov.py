@@ -10,7 +10,7 @@ from typing import List, Dict, Optional
 from datetime import datetime, timezone
 import structlog
 
-from .base import BaseConnector
+from .base import BaseConnector, first_code
 
 logger = structlog.get_logger()
 
@@ -108,7 +108,7 @@ class GrantsGovConnector(BaseConnector):
             "title": title[:500],
             "agency": agency[:200],
             "description": description,
-            "naics_code": raw.get("cfdaList", [None])[0] if raw.get("cfdaList") else None,
+            "naics_code": first_code(raw.get("cfdaList")),
             "set_aside": None,  # Grants.gov doesn't use set-asides (grant-specific)
             "posted_date": open_date,
             "due_date": close_date,
@@ -0,0 +1,64 @@
+"""
+Rewrite vault-encrypted values stored with the legacy double base64 encoding.
+
+Why this exists:
+- encrypt_credentials() used to base64-encode the Fernet token a second time.
+  New values are stored as the plain token; decrypt_credentials() still reads
+  both formats, so running this is optional but shrinks stored ciphertext.
+- Covers `connectors.encrypted_credentials` and `system_settings` API keys
+  (`api_key.*`). Already-migrated rows are skipped, so re-running is safe.
+
+Usage:
+  python backend/scripts/rewrap_credentials.py
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+# Allow running as a script: `python backend/scripts/rewrap_credentials.py`
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from supabase import create_client  # noqa: E402
+from backend.config import settings  # noqa: E402
+from backend.security.vault import (  # noqa: E402
+    decrypt_credentials,
+    encrypt_credentials,
+    is_legacy_token,
+)
+
+
+def _rewrap(value: str) -> str:
+    return encrypt_credentials(decrypt_credentials(value))
+
+
+def main() -> None:
+    if not settings.VAULT_ENCRYPTION_KEY:
+        raise SystemExit("VAULT_ENCRYPTION_KEY is missing in backend/.env")
+    if not settings.SUPABASE_SERVICE_ROLE_KEY:
+        raise SystemExit("SUPABASE_SERVICE_ROLE_KEY is missing in backend/.env")
+
+    sb = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+
+    connectors = sb.table("connectors").select("id, name, encrypted_credentials").execute()
+    for row in connectors.data or []:
+        value = row.get("encrypted_credentials")
+        if not value or not is_legacy_token(value):
+            continue
+        sb.table("connectors").update({"encrypted_credentials": _rewrap(value)}).eq("id", row["id"]).execute()
+        print(f"rewrapped connector {row['name']}")
+
+    keys = sb.table("system_settings").select("key, value").like("key", "api_key.%").execute()
+    for row in keys.data or []:
+        value = row.get("value")
+        if not value or not value.strip() or not is_legacy_token(value):
+            continue
+        sb.table("system_settings").update({"value": _rewrap(value)}).eq("key", row["key"]).execute()
+        print(f"rewrapped {row['key']}")
+
+
+if __name__ == "__main__":
+    main()
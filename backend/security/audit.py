@@ -1,17 +1,22 @@
 """
 Audit Log Signing
-HMAC-SHA256 for cryptographic audit trail integrity
+Keyed BLAKE2b (legacy rows: HMAC-SHA256) for cryptographic audit trail integrity
 """
 import hmac
 import hashlib
 import json
-from typing import Any
+from functools import lru_cache
+from typing import Any, Optional
 import structlog
 
 from ..config import settings
 
 logger = structlog.get_logger()
 
+# Stored in audit_logs.signature_alg and included in the signed payload.
+# Rows without it were signed with HMAC-SHA256.
+SIGNATURE_ALG = "blake2b-256"
+
 
 def _get_signing_key() -> bytes:
     """Get HMAC signing key"""
@@ -21,23 +26,78 @@ def _get_signing_key() -> bytes:
     return key.encode('utf-8') if isinstance(key, str) else key
 
 
-def _canonicalize(data: dict) -> str:
-    """Create canonical string representation for signing"""
-    # Remove the hash field if present
-    sign_data = {k: v for k, v in data.items() if k != "confirmation_hash"}
-    # Sort keys for consistent ordering
-    return json.dumps(sign_data, sort_keys=True, default=str)
+@lru_cache(maxsize=1)
+def _hmac_template(key: bytes) -> "hmac.HMAC":
+    """Keyed HMAC state (ipad/opad already absorbed); copy() it per message"""
+    return hmac.new(key, digestmod=hashlib.sha256)
+
+
+@lru_cache(maxsize=1)
+def _blake2b_key(key: bytes) -> bytes:
+    """BLAKE2b accepts keys up to 64 bytes; longer signing keys are hashed down"""
+    return key if len(key) <= 64 else hashlib.blake2b(key).digest()
+
+
+def _canonicalize(data: dict) -> bytes:
+    """Create canonical byte representation for signing"""
+    # Remove the hash field if present (copy only then; signing never has one).
+    # Legacy rows read back after migration 15 carry signature_alg = NULL; they
+    # were signed without the key, so it is dropped too.
+    sign_data = data
+    if "confirmation_hash" in data or ("signature_alg" in data and data["signature_alg"] is None):
+        sign_data = {
+            k: v for k, v in data.items()
+            if k != "confirmation_hash" and not (k == "signature_alg" and v is None)
+        }
+    # Sort keys for consistent ordering. The exact byte layout (stdlib separators,
+    # ASCII escaping) is what existing confirmation_hash values were computed
+    # over, so it must not change without versioning the signature.
+    return json.dumps(sign_data, sort_keys=True, default=str).encode('utf-8')
+
+
+def _digest(canonical: bytes, signature_alg: Optional[str], key: bytes) -> bytes:
+    """Raw signature bytes over already-canonicalized data"""
+    if signature_alg == SIGNATURE_ALG:
+        return hashlib.blake2b(canonical, key=_blake2b_key(key), digest_size=32).digest()
+    signature = _hmac_template(key).copy()
+    signature.update(canonical)
+    return signature.digest()
+
+
+def _signature_digest(log_data: dict) -> bytes:
+    """Raw signature bytes using the algorithm named in signature_alg"""
+    return _digest(_canonicalize(log_data), log_data.get("signature_alg"), _get_signing_key())
+
+
+def sign_canonical(canonical: bytes, signature_alg: Optional[str] = SIGNATURE_ALG) -> str:
+    """Sign bytes from _canonicalize() directly, for callers that already hold them"""
+    return _digest(canonical, signature_alg, _get_signing_key()).hex()
 
 
 def sign_audit_log(log_data: dict) -> str:
-    """Generate HMAC-SHA256 signature for audit log"""
-    key = _get_signing_key()
-    canonical = _canonicalize(log_data)
-    signature = hmac.new(key, canonical.encode('utf-8'), hashlib.sha256)
-    return signature.hexdigest()
+    """Generate signature for audit log (hex, as stored in confirmation_hash)"""
+    return _signature_digest(log_data).hex()
 
 
 def verify_audit_log(log_data: dict, stored_hash: str) -> bool:
     """Verify audit log integrity by comparing signatures"""
-    computed_hash = sign_audit_log(log_data)
-    return hmac.compare_digest(computed_hash, stored_hash)
+    try:
+        stored_digest = bytes.fromhex(stored_hash)
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(_signature_digest(log_data), stored_digest)
+
+
+def verify_audit_logs(rows: list[dict]) -> list[bool]:
+    """Verify many audit logs (e.g. an archive sweep), resolving the signing key once"""
+    key = _get_signing_key()
+    results = []
+    for row in rows:
+        try:
+            stored_digest = bytes.fromhex(row.get("confirmation_hash") or "")
+        except (TypeError, ValueError):
+            results.append(False)
+            continue
+        computed = _digest(_canonicalize(row), row.get("signature_alg"), key)
+        results.append(hmac.compare_digest(computed, stored_digest))
+    return results
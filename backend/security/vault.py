@@ -4,6 +4,7 @@ Fernet encryption for secure credential storage
 """
 import json
 import base64
+from functools import lru_cache
 from cryptography.fernet import Fernet
 import structlog
 
@@ -11,6 +12,13 @@ from ..config import settings
 
 logger = structlog.get_logger()
 
+
+@lru_cache(maxsize=1)
+def _fernet_for_key(key: str | bytes) -> Fernet:
+    """Build (once per key) the Fernet instance; a changed key simply misses the cache"""
+    return Fernet(key.encode() if isinstance(key, str) else key)
+
+
 def get_fernet() -> Fernet:
     """Get Fernet instance with vault key"""
     key = settings.VAULT_ENCRYPTION_KEY
@@ -19,25 +27,37 @@ def get_fernet() -> Fernet:
     
     # Ensure key is proper format
     try:
-        return Fernet(key.encode() if isinstance(key, str) else key)
+        return _fernet_for_key(key)
     except Exception as e:
         logger.error("Invalid vault encryption key", error=str(e))
         raise ValueError("Invalid VAULT_ENCRYPTION_KEY format")
 
 
+# Fernet tokens start with version byte 0x80, i.e. "gA" once base64-encoded.
+# Values written before the outer base64 wrapper was dropped start with "Z0".
+_FERNET_TOKEN_PREFIX = "gA"
+
+
+def is_legacy_token(encrypted_str: str) -> bool:
+    """True for values stored with the old extra base64 layer around the Fernet token"""
+    return not encrypted_str.startswith(_FERNET_TOKEN_PREFIX)
+
+
 def encrypt_credentials(credentials: dict) -> str:
     """Encrypt credentials dictionary to string for storage"""
     fernet = get_fernet()
     json_bytes = json.dumps(credentials).encode('utf-8')
-    encrypted = fernet.encrypt(json_bytes)
-    return base64.urlsafe_b64encode(encrypted).decode('utf-8')
+    # Fernet tokens are already URL-safe base64
+    return fernet.encrypt(json_bytes).decode('ascii')
 
 
 def decrypt_credentials(encrypted_str: str) -> dict:
     """Decrypt stored credentials back to dictionary"""
     fernet = get_fernet()
-    encrypted_bytes = base64.urlsafe_b64decode(encrypted_str.encode('utf-8'))
-    decrypted = fernet.decrypt(encrypted_bytes)
+    token = encrypted_str.encode('ascii')
+    if is_legacy_token(encrypted_str):
+        token = base64.urlsafe_b64decode(token)
+    decrypted = fernet.decrypt(token)
     return json.loads(decrypted.decode('utf-8'))
 
 
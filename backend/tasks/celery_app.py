@@ -3,7 +3,10 @@ Celery Configuration
 Distributed task queue for scheduled jobs
 """
 from celery import Celery
-from ..config import settings
+from celery.schedules import crontab
+from ..config import configure_logging, settings
+
+configure_logging()
 
 celery_app = Celery(
     "procura",
@@ -24,31 +27,47 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     task_acks_late=True,
     task_reject_on_worker_lost=True,
+    # Beat tasks' return values are never read; skip the result-backend writes.
+    # Tasks whose result is needed opt back in with @celery_app.task(ignore_result=False).
+    task_ignore_result=True,
+    result_expires=3600,
+    task_compression="gzip",
+    result_compression="gzip",
+    # Discovery and follow-up checks are I/O-bound (source APIs, LLM, Supabase)
+    # and get their own queues so workers can be sized/prefetched per workload
+    # (see docker-compose.yml). Anything unrouted lands on "default".
+    task_default_queue="default",
+    task_routes={
+        "backend.tasks.discovery.*": {"queue": "discovery"},
+        "backend.tasks.follow_ups.*": {"queue": "follow_ups"},
+    },
 )
 
-# Beat schedule for periodic tasks
+# Beat schedule for periodic tasks. Crontab entries with staggered minutes so
+# the connectors never fire in the same tick (interval schedules all align on
+# beat start, bursting the source APIs and the opportunities upsert together).
 celery_app.conf.beat_schedule = {
     "discovery-govcon-every-15min": {
         "task": "backend.tasks.discovery.run_discovery_task",
-        "schedule": 900.0,  # 15 minutes
+        "schedule": crontab(minute="0,15,30,45"),
         "args": ["govcon"],
     },
     "discovery-sam-hourly": {
         "task": "backend.tasks.discovery.run_discovery_task",
-        "schedule": 3600.0,  # 1 hour
+        "schedule": crontab(minute="10"),
         "args": ["sam"],
     },
     "discovery-usaspending-every-30min": {
         "task": "backend.tasks.discovery.run_discovery_task",
-        "schedule": 1800.0,  # 30 minutes
+        "schedule": crontab(minute="5,35"),
         "args": ["usaspending"],
     },
     "follow-up-checks-every-hour": {
         "task": "backend.tasks.follow_ups.run_follow_up_checks",
-        "schedule": 3600.0,  # 1 hour
+        "schedule": crontab(minute="20"),
     },
     "opportunity-sync-daily": {
         "task": "backend.tasks.follow_ups.sync_all_submission_opportunities",
-        "schedule": 86400.0,  # 24 hours
+        "schedule": crontab(hour="3", minute="40"),
     },
 }
@@ -8,12 +8,15 @@ from datetime import datetime, timedelta, timezone
 import structlog
 
 from .celery_app import celery_app
-from ..database import get_supabase_client
+from ..database import get_supabase_client, execute_async
 from ..config import settings
 from ..scrapers import GovConAPIConnector, SAMGovConnector, USASpendingConnector, GrantsGovConnector
 
 logger = structlog.get_logger()
 
+# Max auto-qualifications in flight per discovery run (bounds LLM/Supabase load)
+_QUALIFY_CONCURRENCY = 8
+
 CONNECTORS = {
     "govcon": (GovConAPIConnector, "GOVCON_API_KEY"),
     "sam": (SAMGovConnector, "SAM_GOV_API_KEY"),
@@ -22,7 +25,7 @@ CONNECTORS = {
 }
 
 
-@celery_app.task(bind=True, max_retries=3)
+@celery_app.task(bind=True, max_retries=3, rate_limit="10/m")
 def run_discovery_task(self, connector_name: str, since_days: int = 7):
     """
     Celery task to run discovery for a specific connector, then auto-qualify
@@ -37,18 +40,22 @@ async def _run_discovery(connector_name: str, since_days: int, task_id: str):
     from ..security.vault import decrypt_credentials
     from ..ai.qualification import qualify_opportunity as ai_qualify, is_prefilter_pass
     from ..routers.company_profile import get_company_profile
-    from ..routers.opportunities import _send_opportunity_notifications, _NOTIFY_FIT_THRESHOLD
+    from ..routers.opportunities import (
+        _build_opportunity_notifications,
+        _notification_recipient_ids,
+        _NOTIFY_FIT_THRESHOLD,
+    )
 
     supabase = get_supabase_client()
     start_time = datetime.now(timezone.utc)
 
     # Create run record
-    run = supabase.table("discovery_runs").insert({
+    run = await execute_async(supabase.table("discovery_runs").insert({
         "connector_name": connector_name,
         "run_type": "scheduled",
         "status": "running",
         "start_time": start_time.isoformat(),
-    }).execute()
+    }))
     run_id = run.data[0]["id"]
 
     try:
@@ -59,7 +66,7 @@ async def _run_discovery(connector_name: str, since_days: int, task_id: str):
 
         # Resolve API key: DB connector record → env var
         api_key = None
-        connector_record = supabase.table("connectors").select("*").eq("name", connector_name).execute()
+        connector_record = await execute_async(supabase.table("connectors").select("*").eq("name", connector_name))
         if connector_record.data:
             try:
                 creds = decrypt_credentials(connector_record.data[0]["encrypted_credentials"])
@@ -70,105 +77,111 @@ async def _run_discovery(connector_name: str, since_days: int, task_id: str):
         if not api_key and key_env:
             api_key = get_api_key(key_env)
 
-        # Run discovery
+        # Run discovery and upsert everything in one round-trip per chunk
         since = datetime.now(timezone.utc) - timedelta(days=since_days)
+        rows: list[dict] = []
         async with connector_class(api_key=api_key) as connector:
             result = await connector.run_discovery(since)
-
-        opps = result.get("opportunities", [])
-
-        # ── Upsert all discovered opportunities ──────────────────────────────
-        created_ids: list[str] = []
-        for opp in opps:
+            opps = result.get("opportunities", [])
             try:
-                existing = supabase.table("opportunities") \
-                    .select("id, fit_score") \
-                    .eq("external_ref", opp["external_ref"]) \
-                    .execute()
-
-                if existing.data:
-                    supabase.table("opportunities").update(opp).eq("id", existing.data[0]["id"]).execute()
-                    # Re-qualify if this is a known opp without scores
-                    if existing.data[0].get("fit_score") is None:
-                        created_ids.append(existing.data[0]["id"])
-                else:
-                    inserted = supabase.table("opportunities").insert(opp).execute()
-                    if inserted.data:
-                        created_ids.append(inserted.data[0]["id"])
+                rows = await connector.persist_bulk(supabase, opps)
             except Exception as e:
-                logger.warning("Failed to upsert opportunity", error=str(e)[:200])
+                logger.warning("Failed to upsert opportunities", error=str(e)[:200])
 
-        # ── Auto-qualify new/unscored opportunities ──────────────────────────
-        profile = get_company_profile()
-        qualified = 0
-        notified = 0
+        created_count = sum(1 for r in rows if r["inserted"])
+        # New opportunities plus known ones that were never scored
+        unscored = [r["opportunity"] for r in rows if r["opportunity"].get("fit_score") is None]
 
-        if created_ids:
-            rows = supabase.table("opportunities").select("*").in_("id", created_ids).execute()
-            for opp_row in rows.data or []:
+        # ── Auto-qualify new/unscored opportunities ──────────────────────────
+        # LLM + Supabase calls are I/O-bound; run a bounded number concurrently.
+        # Each task writes its own score columns; notifications are collected and written in bulk below.
+        profile = await asyncio.to_thread(get_company_profile)
+        sem = asyncio.Semaphore(_QUALIFY_CONCURRENCY)
+
+        async def _qualify_one(opp_row: dict) -> dict | None:
+            """Returns the opportunity row with scores applied, or None if skipped/failed."""
+            async with sem:
                 try:
                     if not is_prefilter_pass(opp_row, profile):
-                        continue
+                        return None
 
                     analysis = await ai_qualify(opp_row, force_refresh=False)
-                    fit = analysis.get("fit_score", 0)
-                    supabase.table("opportunities").update({
+                    scores = {
                         "fit_score": analysis.get("fit_score"),
                         "effort_score": analysis.get("effort_score"),
                         "urgency_score": analysis.get("urgency_score"),
                         "ai_summary": analysis.get("summary"),
-                    }).eq("id", opp_row["id"]).execute()
-                    qualified += 1
-
-                    if fit >= _NOTIFY_FIT_THRESHOLD:
-                        _send_opportunity_notifications(supabase, opp_row, fit)
-                        notified += 1
-
-                    # Run pipeline orchestrator (may auto-create submissions in supervised/autonomous modes)
-                    try:
-                        from ..workflows.pipeline import run_pipeline
-                        updated_opp = {**opp_row, "fit_score": fit}
-                        await run_pipeline(updated_opp, fit)
-                    except Exception as pe:
-                        logger.warning("Pipeline orchestration failed", opp_id=opp_row.get("id"), error=str(pe)[:200])
+                    }
+                    # Only the score columns: writing the whole row back would
+                    # clobber edits made since it was read.
+                    await execute_async(
+                        supabase.table("opportunities").update(scores).eq("id", opp_row["id"])
+                    )
+                    return {**opp_row, **scores}
 
                 except Exception as e:
                     logger.warning("Auto-qualification failed", opp_id=opp_row.get("id"), error=str(e)[:200])
+                    return None
+
+        outcomes = await asyncio.gather(*[_qualify_one(r) for r in unscored])
+        # Only rows whose scores were saved go on to the pipeline and notifications
+        scored_rows = [r for r in outcomes if r is not None]
+        qualified = len(scored_rows)
+        notified = 0
+
+        # Run pipeline orchestrator (may auto-create submissions in supervised/autonomous modes)
+        if scored_rows:
+            from ..workflows.pipeline import run_pipeline_batch
+            await run_pipeline_batch([(r, r.get("fit_score") or 0) for r in scored_rows])
+
+        high_fit = [r for r in scored_rows if (r.get("fit_score") or 0) >= _NOTIFY_FIT_THRESHOLD]
+        if high_fit:
+            try:
+                recipient_ids = await asyncio.to_thread(_notification_recipient_ids, supabase)
+                notifications = [
+                    n for r in high_fit
+                    for n in _build_opportunity_notifications(recipient_ids, r, r["fit_score"])
+                ]
+                if notifications:
+                    await execute_async(supabase.table("notifications").insert(notifications))
+                    notified = len(high_fit)
+            except Exception as e:
+                logger.warning("Failed to send notifications", error=str(e)[:200])
 
         # ── Update run record ────────────────────────────────────────────────
         end_time = datetime.now(timezone.utc)
-        supabase.table("discovery_runs").update({
+        await execute_async(supabase.table("discovery_runs").update({
             "status": "success",
             "end_time": end_time.isoformat(),
             "duration_ms": int((end_time - start_time).total_seconds() * 1000),
             "records_fetched": result.get("records_fetched", 0),
-            "opportunities_created": len(created_ids),
-            "opportunities_updated": len(opps) - len(created_ids),
+            "opportunities_created": created_count,
+            "opportunities_updated": len(rows) - created_count,
             "errors": len(result.get("errors", [])),
-        }).eq("id", run_id).execute()
+        }).eq("id", run_id))
 
         if connector_record.data:
-            supabase.table("connectors").update({
+            await execute_async(supabase.table("connectors").update({
                 "last_run_at": end_time.isoformat(),
                 "last_success_at": end_time.isoformat(),
                 "error_count": 0,
-            }).eq("id", connector_record.data[0]["id"]).execute()
+            }).eq("id", connector_record.data[0]["id"]))
 
         logger.info(
             "Scheduled discovery completed",
             connector=connector_name,
             total=len(opps),
-            new=len(created_ids),
+            new=created_count,
             qualified=qualified,
             notified=notified,
         )
-        return {"success": True, "fetched": len(opps), "new": len(created_ids), "qualified": qualified, "notified": notified}
+        return {"success": True, "fetched": len(opps), "new": created_count, "qualified": qualified, "notified": notified}
 
     except Exception as e:
         logger.error("Discovery task failed", connector=connector_name, error=str(e))
-        supabase.table("discovery_runs").update({
+        await execute_async(supabase.table("discovery_runs").update({
             "status": "failed",
             "end_time": datetime.now(timezone.utc).isoformat(),
             "error_message": str(e)[:500],
-        }).eq("id", run_id).execute()
+        }).eq("id", run_id))
         raise
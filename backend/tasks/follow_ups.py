@@ -4,14 +4,37 @@ Celery tasks for automated application follow-up checks and opportunity sync.
 """
 import asyncio
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from celery import shared_task
+import httpx
 import structlog
 
 from .celery_app import celery_app
-from ..database import get_supabase_client
+from ..database import get_supabase_client, execute_async
 
 logger = structlog.get_logger()
 
+# Sources whose opportunity status can be re-checked against the live API
+_STATUS_CHECK_SOURCES = frozenset({"sam.gov", "sam"})
+# Max SAM.gov status checks in flight per follow-up run
+_STATUS_CHECK_CONCURRENCY = 10
+# Ids per .in_() filter; keeps the GET query string well under URL length limits
+_ID_BATCH_SIZE = 200
+
+
+def _sam_client() -> httpx.AsyncClient:
+    """
+    Keep-alive client for SAM.gov status checks, shared by every check in a run.
+
+    Created per run rather than at import: each Celery task drives its own event
+    loop via asyncio.run(), and pooled connections can't outlive their loop.
+    """
+    return httpx.AsyncClient(
+        base_url="https://api.sam.gov",
+        timeout=15,
+        limits=httpx.Limits(max_keepalive_connections=16),
+    )
+
 
 @celery_app.task(bind=True, max_retries=3)
 def run_follow_up_checks(self):
@@ -25,17 +48,22 @@ def run_follow_up_checks(self):
 async def _run_follow_up_checks():
     """Async implementation of follow-up check loop."""
     supabase = get_supabase_client()
+    sam_client = _sam_client()
 
     try:
-        # Get all follow-ups that are due for checking
-        now = datetime.now(timezone.utc).isoformat()
-        pending = (
+        # Get all follow-ups that are due for checking. One timestamp for the
+        # whole run: it's the due cutoff and the recorded check time.
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+        pending = await execute_async(
             supabase.table("follow_ups")
-            .select("*, submission:submissions(id, title, portal, status)")
+            .select(
+                "*, submission:submissions(id, title, portal, status), "
+                "opportunity:opportunities(source, external_ref, status)"
+            )
             .in_("status", ["pending", "checked", "updated"])
-            .lte("next_check_at", now)
+            .lte("next_check_at", now_iso)
             .eq("auto_check", True)
-            .execute()
         )
 
         if not pending.data:
@@ -45,42 +73,70 @@ async def _run_follow_up_checks():
         checked = 0
         updated = 0
 
-        for follow_up in pending.data:
+        # Retire follow-ups that have used up their checks in one UPDATE.
+        # (PostgREST filters can't compare two columns, so the split happens here.)
+        exhausted_ids = [f["id"] for f in pending.data if f["checks_performed"] >= f["max_checks"]]
+        eligible = [f for f in pending.data if f["checks_performed"] < f["max_checks"]]
+        if exhausted_ids:
             try:
-                # Check if max checks reached
-                if follow_up["checks_performed"] >= follow_up["max_checks"]:
-                    supabase.table("follow_ups").update({
-                        "status": "no_change",
-                    }).eq("id", follow_up["id"]).execute()
-                    continue
-
-                submission = follow_up.get("submission", {})
-
-                # For submitted applications, we attempt a portal status check
-                # using AI to analyze the opportunity status from the source
-                result = await _check_opportunity_status(
+                await execute_async(
+                    supabase.table("follow_ups").update({"status": "no_change"}).in_("id", exhausted_ids)
+                )
+            except Exception as e:
+                logger.error("Failed to close exhausted follow-ups", count=len(exhausted_ids), error=str(e))
+
+        # For submitted applications, we attempt a portal status check
+        # using AI to analyze the opportunity status from the source.
+        # Only SAM.gov can be re-checked; other sources keep their status.
+        # Checks are latency-bound, so they run concurrently (bounded for SAM.gov's rate limits).
+        sem = asyncio.Semaphore(_STATUS_CHECK_CONCURRENCY)
+
+        async def _status_for(follow_up: dict) -> dict:
+            opp = follow_up.get("opportunity")
+            if opp and opp.get("source") not in _STATUS_CHECK_SOURCES:
+                return {"status": opp.get("status") or "unknown", "changed": False, "source": opp.get("source")}
+            async with sem:
+                return await _check_opportunity_status(
                     follow_up["opportunity_id"],
                     supabase,
+                    opp,
+                    sam_client,
                 )
 
+        results = await asyncio.gather(*[_status_for(f) for f in eligible], return_exceptions=True)
+
+        # Check history, notifications and award correspondence are written in bulk after the loop
+        check_rows: list[dict] = []
+        notif_rows: list[dict] = []
+        corr_rows: list[dict] = []
+
+        for follow_up, result in zip(eligible, results):
+            try:
+                if isinstance(result, BaseException):
+                    raise result
+
+                submission = follow_up.get("submission", {})
+
                 # Record the check
-                supabase.table("follow_up_checks").insert({
+                check_rows.append({
                     "follow_up_id": follow_up["id"],
                     "check_type": "automated",
                     "status_found": result.get("status"),
                     "changes_detected": result.get("changed", False),
                     "details": result,
                     "ai_analysis": result.get("analysis"),
-                }).execute()
+                })
 
-                # Update follow-up record
-                new_status = "updated" if result.get("changed") else "checked"
+                # Update follow-up record; an award detected on a change closes it out
+                portal_status = (result.get("status") or "").lower()
+                awarded = bool(result.get("changed")) and ("award" in portal_status or "won" in portal_status)
+                new_status = "awarded" if awarded else ("updated" if result.get("changed") else "checked")
                 interval = follow_up["check_interval_hours"]
-                next_check = datetime.now(timezone.utc) + timedelta(hours=interval)
+                next_check = now + timedelta(hours=interval)
 
                 update_data = {
                     "status": new_status,
-                    "last_checked_at": datetime.now(timezone.utc).isoformat(),
+                    "last_checked_at": now_iso,
                     "last_result": result,
                     "portal_status": result.get("status"),
                     "checks_performed": follow_up["checks_performed"] + 1,
@@ -90,7 +146,7 @@ async def _run_follow_up_checks():
                 if result.get("analysis"):
                     update_data["ai_change_summary"] = result["analysis"]
 
-                supabase.table("follow_ups").update(update_data).eq("id", follow_up["id"]).execute()
+                await execute_async(supabase.table("follow_ups").update(update_data).eq("id", follow_up["id"]))
 
                 checked += 1
                 if result.get("changed"):
@@ -98,117 +154,125 @@ async def _run_follow_up_checks():
 
                     # Create notification for status change
                     if follow_up.get("assigned_to"):
-                        try:
-                            supabase.table("notifications").insert({
-                                "user_id": follow_up["assigned_to"],
-                                "title": f"Application Status Update",
-                                "body": f"Status changed to '{result.get('status')}' for {submission.get('title', 'submission')}",
-                                "type": "follow_up",
-                                "priority": "high",
-                                "entity_type": "follow_up",
-                                "entity_id": follow_up["id"],
-                            }).execute()
-                        except Exception:
-                            pass
-
-                    # Check for award
-                    portal_status = (result.get("status") or "").lower()
-                    if "award" in portal_status or "won" in portal_status:
-                        supabase.table("follow_ups").update({
-                            "status": "awarded",
-                        }).eq("id", follow_up["id"]).execute()
+                        notif_rows.append({
+                            "user_id": follow_up["assigned_to"],
+                            "title": f"Application Status Update",
+                            "body": f"Status changed to '{result.get('status')}' for {submission.get('title', 'submission')}",
+                            "type": "follow_up",
+                            "priority": "high",
+                            "entity_type": "follow_up",
+                            "entity_id": follow_up["id"],
+                        })
 
+                    if awarded:
                         # Auto-create correspondence record for the award
-                        try:
-                            supabase.table("correspondence").insert({
-                                "submission_id": follow_up.get("submission_id"),
-                                "opportunity_id": follow_up.get("opportunity_id"),
-                                "type": "award_notice",
-                                "status": "new",
-                                "subject": f"Contract Award Detected: {submission.get('title', '')}",
-                                "body": result.get("analysis", "Award detected via automated status check."),
-                                "source": "ai_detected",
-                                "ai_summary": result.get("analysis"),
-                                "ai_sentiment": "positive",
-                                "ai_suggested_actions": [
-                                    "Review award details",
-                                    "Confirm acceptance",
-                                    "Begin contract onboarding",
-                                    "Notify team members",
-                                ],
-                            }).execute()
-                        except Exception:
-                            pass
+                        corr_rows.append({
+                            "submission_id": follow_up.get("submission_id"),
+                            "opportunity_id": follow_up.get("opportunity_id"),
+                            "type": "award_notice",
+                            "status": "new",
+                            "subject": f"Contract Award Detected: {submission.get('title', '')}",
+                            "body": result.get("analysis", "Award detected via automated status check."),
+                            "source": "ai_detected",
+                            "ai_summary": result.get("analysis"),
+                            "ai_sentiment": "positive",
+                            "ai_suggested_actions": [
+                                "Review award details",
+                                "Confirm acceptance",
+                                "Begin contract onboarding",
+                                "Notify team members",
+                            ],
+                        })
 
             except Exception as e:
                 logger.error("Follow-up check failed", follow_up_id=follow_up["id"], error=str(e))
 
+        for table, rows in (("follow_up_checks", check_rows), ("notifications", notif_rows), ("correspondence", corr_rows)):
+            if not rows:
+                continue
+            try:
+                await execute_async(supabase.table(table).insert(rows))
+            except Exception as e:
+                logger.error("Failed to record follow-up results", table=table, count=len(rows), error=str(e))
+
         logger.info("Follow-up checks completed", checked=checked, updated=updated)
         return {"checked": checked, "updated": updated}
 
     except Exception as e:
         logger.error("Follow-up check task failed", error=str(e))
         raise
+    finally:
+        await sam_client.aclose()
 
 
-async def _check_opportunity_status(opportunity_id: str, supabase) -> dict:
+async def _check_opportunity_status(
+    opportunity_id: str,
+    supabase,
+    opp: Optional[dict] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
     """
     Check the current status of an opportunity from its source.
     Uses the source API (SAM.gov, GovCon) to pull latest data.
+    ``opp`` (source, external_ref, status) skips the lookup when the caller already has it;
+    ``client`` is the run's shared SAM.gov client (a one-off client is used if omitted).
     """
     if not opportunity_id:
         return {"status": "unknown", "changed": False}
 
+    if client is None:
+        async with _sam_client() as client:
+            return await _check_opportunity_status(opportunity_id, supabase, opp, client)
+
     try:
-        opp = (
-            supabase.table("opportunities")
-            .select("external_ref, source, status, raw_data")
-            .eq("id", opportunity_id)
-            .single()
-            .execute()
-        )
-        if not opp.data:
+        if opp is None:
+            response = await execute_async(
+                supabase.table("opportunities")
+                .select("external_ref, source, status")
+                .eq("id", opportunity_id)
+                .single()
+            )
+            opp = response.data
+        if not opp:
             return {"status": "not_found", "changed": False}
 
         # Re-fetch from source API if possible
         from ..api_keys import get_api_key
 
-        source = opp.data["source"]
-        external_ref = opp.data["external_ref"]
-        old_status = opp.data.get("status")
+        source = opp["source"]
+        external_ref = opp["external_ref"]
+        old_status = opp.get("status")
 
-        if source == "sam.gov" or source == "sam":
+        if source in _STATUS_CHECK_SOURCES:
             api_key = get_api_key("SAM_GOV_API_KEY")
             if api_key:
-                import httpx
-                async with httpx.AsyncClient(timeout=15) as client:
-                    resp = await client.get(
-                        f"https://api.sam.gov/opportunities/v2/search",
-                        params={"api_key": api_key, "solnum": external_ref, "limit": 1},
-                    )
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        opps = data.get("opportunitiesData", [])
-                        if opps:
-                            new_raw = opps[0]
-                            new_status = new_raw.get("type", "").lower()
-
-                            changed = new_status != old_status
-                            analysis = None
-                            if changed:
-                                analysis = f"Status changed from '{old_status}' to '{new_status}' on SAM.gov"
-
-                                # Update the opportunity record
-                                supabase.table("opportunities").update({
-                                    "raw_data": new_raw,
-                                }).eq("id", opportunity_id).execute()
-
-                            return {
-                                "status": new_status,
-                                "changed": changed,
-                                "analysis": analysis,
-                                "source": "sam.gov",
-                            }
+                resp = await client.get(
+                    "/opportunities/v2/search",
+                    params={"api_key": api_key, "solnum": external_ref, "limit": 1},
+                )
+                if resp.status_code == 200:
+                    data = resp.json()
+                    opps = data.get("opportunitiesData", [])
+                    if opps:
+                        new_raw = opps[0]
+                        new_status = new_raw.get("type", "").lower()
+
+                        changed = new_status != old_status
+                        analysis = None
+                        if changed:
+                            analysis = f"Status changed from '{old_status}' to '{new_status}' on SAM.gov"
+
+                            # Update the opportunity record
+                            await execute_async(supabase.table("opportunities").update({
+                                "raw_data": new_raw,
+                            }).eq("id", opportunity_id))
+
+                        return {
+                            "status": new_status,
+                            "changed": changed,
+                            "analysis": analysis,
+                            "source": "sam.gov",
+                        }
 
         # For other sources or if API check fails, return current status
         return {
@@ -237,56 +301,71 @@ async def _sync_all_submissions():
 
     try:
         # Get all non-terminal submissions
-        active = (
+        active = await execute_async(
             supabase.table("submissions")
             .select("id, opportunity_id, due_date, owner_id, title")
             .not_.is_("status", "submitted")
             .not_.is_("status", "rejected")
-            .execute()
         )
 
         if not active.data:
             return {"synced": 0}
 
-        synced = 0
+        # One query per batch of linked opportunities instead of one per submission
+        opp_ids = list({s["opportunity_id"] for s in active.data if s.get("opportunity_id")})
+        batches = [opp_ids[i:i + _ID_BATCH_SIZE] for i in range(0, len(opp_ids), _ID_BATCH_SIZE)]
+        results = await asyncio.gather(*[
+            execute_async(
+                supabase.table("opportunities")
+                .select("id, due_date, status, title")
+                .in_("id", batch)
+            )
+            for batch in batches
+        ])
+        opps_by_id = {o["id"]: o for r in results for o in r.data or []}
+
+        changed: list[tuple[dict, str, str]] = []
         for sub in active.data:
-            try:
-                opp = (
-                    supabase.table("opportunities")
-                    .select("due_date, status, title")
-                    .eq("id", sub["opportunity_id"])
-                    .single()
-                    .execute()
-                )
-                if not opp.data:
-                    continue
-
-                changes = {}
-                opp_due = str(opp.data.get("due_date", ""))
-                sub_due = str(sub.get("due_date", ""))
-                if opp_due and sub_due and opp_due != sub_due:
-                    changes["due_date"] = opp_due
-
-                if changes:
-                    supabase.table("submissions").update(changes).eq("id", sub["id"]).execute()
-                    synced += 1
-
-                    # Notify owner
-                    try:
-                        supabase.table("notifications").insert({
-                            "user_id": sub["owner_id"],
-                            "title": "Deadline Updated",
-                            "body": f"Deadline changed from {sub_due} to {opp_due} for '{sub.get('title', '')}'",
-                            "type": "deadline",
-                            "priority": "high",
-                            "entity_type": "submission",
-                            "entity_id": sub["id"],
-                        }).execute()
-                    except Exception:
-                        pass
+            opp = opps_by_id.get(sub.get("opportunity_id"))
+            if not opp:
+                continue
 
+            opp_due = str(opp.get("due_date", ""))
+            sub_due = str(sub.get("due_date", ""))
+            if opp_due and sub_due and opp_due != sub_due:
+                changed.append((sub, sub_due, opp_due))
+
+        # Per-row updates (an upsert would need every NOT NULL column), issued concurrently
+        async def _apply(sub: dict, opp_due: str) -> bool:
+            try:
+                await execute_async(supabase.table("submissions").update({"due_date": opp_due}).eq("id", sub["id"]))
+                return True
             except Exception as e:
                 logger.warning("Failed to sync submission", submission_id=sub["id"], error=str(e))
+                return False
+
+        applied = await asyncio.gather(*[_apply(sub, opp_due) for sub, _, opp_due in changed])
+        synced_rows = [c for c, ok in zip(changed, applied) if ok]
+        synced = len(synced_rows)
+
+        # Notify owners in a single insert
+        notifications = [
+            {
+                "user_id": sub["owner_id"],
+                "title": "Deadline Updated",
+                "body": f"Deadline changed from {sub_due} to {opp_due} for '{sub.get('title', '')}'",
+                "type": "deadline",
+                "priority": "high",
+                "entity_type": "submission",
+                "entity_id": sub["id"],
+            }
+            for sub, sub_due, opp_due in synced_rows
+        ]
+        if notifications:
+            try:
+                await execute_async(supabase.table("notifications").insert(notifications))
+            except Exception:
+                pass
 
         logger.info("Opportunity sync completed", synced=synced, total=len(active.data))
         return {"synced": synced, "total": len(active.data)}
@@ -14,11 +14,16 @@ from __future__ import annotations
 
 import asyncio
 import os
+import re
 import sys
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import AsyncIterator
 from datetime import datetime, timedelta, timezone
 
 import httpx
 import pytest
+from orjson import loads as _json_loads
 
 # Allow running as a script: `python backend/test_connectors.py`
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -30,128 +35,179 @@ from backend.scrapers.govcon_api import GovConAPIConnector
 
 USASPENDING_BASE = settings.USASPENDING_API_BASE or "https://api.usaspending.gov/api/v2"
 NEWS_API_BASE = settings.NEWS_API_BASE or "https://newsapi.org/v2"
+# One-shot smoke script: read the keys once at import, staleness is a non-issue
+NEWS_API_KEY = settings.NEWS_API_KEY
+SAM_GOV_API_KEY = settings.SAM_GOV_API_KEY
+GOVCON_API_KEY = settings.GOVCON_API_KEY
+
+
+# "placeholder" anywhere (any case), or a template value like "your-api-key"
+_PLACEHOLDER_RE = re.compile(r"(?i:placeholder)|^\s*your-")
 
 
 def _is_placeholder(value: str | None) -> bool:
-    if not value:
-        return True
-    v = value.strip()
-    if not v:
-        return True
-    upper = v.upper()
-    return upper == "PLACEHOLDER" or "PLACEHOLDER" in upper or v.startswith("your-")
+    return not value or not value.strip() or _PLACEHOLDER_RE.search(value) is not None
+
+
+# Fail fast on unreachable hosts and pool starvation; only reads get the long budget
+_TIMEOUT = httpx.Timeout(connect=5.0, read=25.0, write=5.0, pool=5.0)
+
+
+def _make_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=_TIMEOUT,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+
+
+@asynccontextmanager
+async def _client_or_new(client: httpx.AsyncClient | None) -> AsyncIterator[httpx.AsyncClient]:
+    """Use the shared client from main(), or a short-lived one when run under pytest."""
+    if client is not None:
+        yield client
+        return
+    async with _make_client() as own:
+        yield own
+
+
+# Enough raw bytes for the 500-character error excerpt, even with multi-byte text
+_ERROR_EXCERPT_BYTES = 4096
+
+
+async def _request_json(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> dict | None:
+    """
+    Stream the response: parse the body on 200, otherwise print a bounded
+    excerpt without buffering the whole error page (SAM.gov's can be several MB).
+    """
+    async with client.stream(method, url, **kwargs) as response:
+        if response.status_code != 200:
+            print(f"FAILED - Status: {response.status_code}")
+            excerpt = bytearray()
+            async for chunk in response.aiter_bytes():
+                excerpt += chunk
+                if len(excerpt) >= _ERROR_EXCERPT_BYTES:
+                    break
+            print(excerpt[:_ERROR_EXCERPT_BYTES].decode("utf-8", "replace")[:500])
+            return None
+        body = await response.aread()
+    return _json_loads(body)
+
+
+# Only the time window changes between runs; tuples serialize as JSON arrays
+_USASPENDING_AWARD_TYPES = ("A", "B", "C", "D")  # Contracts
+_USASPENDING_STATIC = MappingProxyType({
+    "fields": (
+        "Award ID",
+        "Recipient Name",
+        "Award Amount",
+        "Awarding Agency",
+        "Description",
+        "NAICS Code",
+        "Start Date",
+    ),
+    "limit": 10,
+    "page": 1,
+    "sort": "Award Amount",
+    "order": "desc",
+})
 
 
 @pytest.mark.asyncio
-async def test_usaspending() -> list[dict]:
+async def test_usaspending(
+    client: httpx.AsyncClient | None = None, now: datetime | None = None
+) -> list[dict]:
     """Test USAspending API - Public, no key needed"""
     print("\n" + "=" * 60)
     print("TESTING: USAspending.gov API")
     print("=" * 60)
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    now = now or datetime.now(timezone.utc)
+    async with _client_or_new(client) as client:
         payload = {
+            **_USASPENDING_STATIC,
             "filters": {
                 "time_period": [
                     {
-                        "start_date": (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%d"),
-                        "end_date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                        "start_date": (now - timedelta(days=30)).strftime("%Y-%m-%d"),
+                        "end_date": now.strftime("%Y-%m-%d"),
                     }
                 ],
-                "award_type_codes": ["A", "B", "C", "D"],  # Contracts
+                "award_type_codes": _USASPENDING_AWARD_TYPES,
             },
-            "fields": [
-                "Award ID",
-                "Recipient Name",
-                "Award Amount",
-                "Awarding Agency",
-                "Description",
-                "NAICS Code",
-                "Start Date",
-            ],
-            "limit": 10,
-            "page": 1,
-            "sort": "Award Amount",
-            "order": "desc",
         }
 
-        response = await client.post(f"{USASPENDING_BASE}/search/spending_by_award", json=payload)
-
-        if response.status_code != 200:
-            print(f"FAILED - Status: {response.status_code}")
-            print(response.text[:500])
+        data = await _request_json(
+            client, "POST", f"{USASPENDING_BASE}/search/spending_by_award", json=payload
+        )
+        if data is None:
             return []
 
-        data = response.json()
         results = data.get("results", [])
         print(f"OK - Retrieved {len(results)} contract awards")
         return results
 
 
 @pytest.mark.asyncio
-async def test_newsapi() -> list[dict]:
+async def test_newsapi(client: httpx.AsyncClient | None = None) -> list[dict]:
     """Test NewsAPI - Requires key"""
+    if _is_placeholder(NEWS_API_KEY):
+        print("SKIPPED: NewsAPI — NEWS_API_KEY not configured")
+        return []
+
     print("\n" + "=" * 60)
     print("TESTING: NewsAPI (Government Contract News)")
     print("=" * 60)
 
-    if _is_placeholder(settings.NEWS_API_KEY):
-        print("SKIPPED - NEWS_API_KEY not configured")
-        return []
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with _client_or_new(client) as client:
         params = {
             "q": "government contracts OR federal procurement",
             "language": "en",
             "sortBy": "publishedAt",
             "pageSize": 5,
-            "apiKey": settings.NEWS_API_KEY,
+            "apiKey": NEWS_API_KEY,
         }
 
-        response = await client.get(f"{NEWS_API_BASE}/everything", params=params)
-
-        if response.status_code != 200:
-            print(f"FAILED - Status: {response.status_code}")
-            print(response.text[:500])
+        data = await _request_json(client, "GET", f"{NEWS_API_BASE}/everything", params=params)
+        if data is None:
             return []
 
-        data = response.json()
         articles = data.get("articles", [])
         print(f"OK - Retrieved {len(articles)} news articles")
         return articles
 
 
 @pytest.mark.asyncio
-async def test_sam_gov() -> list[dict]:
+async def test_sam_gov(
+    client: httpx.AsyncClient | None = None, now: datetime | None = None
+) -> list[dict]:
     """Test SAM.gov opportunities endpoint"""
+    if _is_placeholder(SAM_GOV_API_KEY):
+        print("SKIPPED: SAM.gov — SAM_GOV_API_KEY not configured")
+        return []
+
     print("\n" + "=" * 60)
     print("TESTING: SAM.gov API (Opportunities)")
     print("=" * 60)
 
-    if _is_placeholder(settings.SAM_GOV_API_KEY):
-        print("SKIPPED - SAM_GOV_API_KEY not configured")
-        return []
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    now = now or datetime.now(timezone.utc)
+    async with _client_or_new(client) as client:
         params = {
             "limit": 10,
-            "postedFrom": (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%m/%d/%Y"),
-            "postedTo": datetime.now(timezone.utc).strftime("%m/%d/%Y"),
+            "postedFrom": (now - timedelta(days=7)).strftime("%m/%d/%Y"),
+            "postedTo": now.strftime("%m/%d/%Y"),
             "status": "active",
         }
 
-        response = await client.get(
+        data = await _request_json(
+            client,
+            "GET",
             "https://api.sam.gov/opportunities/v2/search",
             params=params,
-            headers={"X-Api-Key": settings.SAM_GOV_API_KEY},
+            headers={"X-Api-Key": SAM_GOV_API_KEY},
         )
-
-        if response.status_code != 200:
-            print(f"FAILED - Status: {response.status_code}")
-            print(response.text[:500])
+        if data is None:
             return []
 
-        data = response.json()
         opps = data.get("opportunitiesData", [])
         print(f"OK - Retrieved {len(opps)} opportunities")
         return opps
@@ -160,16 +216,16 @@ async def test_sam_gov() -> list[dict]:
 @pytest.mark.asyncio
 async def test_govcon() -> list[dict]:
     """Test GovCon API opportunities search (via our connector)"""
+    if _is_placeholder(GOVCON_API_KEY):
+        print("SKIPPED: GovCon API — GOVCON_API_KEY not configured")
+        return []
+
     print("\n" + "=" * 60)
     print("TESTING: GovCon API (Opportunities)")
     print("=" * 60)
 
-    if _is_placeholder(settings.GOVCON_API_KEY):
-        print("SKIPPED - GOVCON_API_KEY not configured")
-        return []
-
     try:
-        async with GovConAPIConnector(api_key=settings.GOVCON_API_KEY) as connector:
+        async with GovConAPIConnector(api_key=GOVCON_API_KEY) as connector:
             results = await connector.fetch_opportunities()
             print(f"OK - Retrieved {len(results)} opportunities")
             return results
@@ -179,15 +235,29 @@ async def test_govcon() -> list[dict]:
 
 
 async def main() -> dict:
+    # One clock reading for the banner and every test's date window
+    now = datetime.now(timezone.utc)
     print("=" * 60)
     print("PROCURA DISCOVERY CONNECTOR TEST")
-    print(f"Time: {datetime.now(timezone.utc).isoformat()}")
+    print(f"Time: {now.isoformat()}")
     print("=" * 60)
 
-    usaspending_data = await test_usaspending()
-    news_data = await test_newsapi()
-    sam_data = await test_sam_gov()
-    govcon_data = await test_govcon()
+    # Independent HTTP round trips: run them concurrently over one pooled client
+    # (GovCon goes through its connector, which owns its client)
+    async with _make_client() as client:
+        results = await asyncio.gather(
+            test_usaspending(client, now),
+            test_newsapi(client),
+            test_sam_gov(client, now),
+            test_govcon(),
+            return_exceptions=True,
+        )
+    for name, result in zip(("USAspending", "NewsAPI", "SAM.gov", "GovCon API"), results):
+        if isinstance(result, BaseException):
+            print(f"FAILED - {name} error: {result}")
+    usaspending_data, news_data, sam_data, govcon_data = (
+        [] if isinstance(r, BaseException) else r for r in results
+    )
 
     print("\n" + "=" * 60)
     print("SUMMARY")
@@ -205,5 +275,18 @@ async def main() -> dict:
     }
 
 
+def _install_fast_event_loop() -> None:
+    """Use uvloop (winloop on Windows) when installed; fall back to the stdlib loop."""
+    try:
+        if sys.platform == "win32":
+            import winloop as loop_impl
+        else:
+            import uvloop as loop_impl  # shipped with uvicorn[standard]
+    except ImportError:
+        return
+    loop_impl.install()
+
+
 if __name__ == "__main__":
+    _install_fast_event_loop()
     asyncio.run(main())
@@ -16,12 +16,16 @@ os.environ.setdefault("AUDIT_SIGNING_KEY", "test-audit-signing-key")
 os.environ.setdefault("ENVIRONMENT", "test")
 os.environ.setdefault("DEBUG", "true")
 
+from collections import deque
 from typing import Any, Optional
 from unittest.mock import MagicMock
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 
+from backend.database import get_optional_db
 from backend.dependencies import get_current_user, require_officer, require_admin, get_request_supabase
 from backend.main import app
 
@@ -33,98 +37,94 @@ from backend.main import app
 class MockResponse:
     """Mimics the postgrest response object."""
 
+    __slots__ = ("data", "count")
+
     def __init__(self, data: list | dict | None = None, count: int | None = None):
         if data is None:
             data = []
         self.data = data
         self.count = count if count is not None else (len(data) if isinstance(data, list) else 1)
 
+    # Fast paths for when the caller already knows the payload shape.
+
+    @classmethod
+    def from_list(cls, data: list) -> "MockResponse":
+        resp = cls.__new__(cls)
+        resp.data = data
+        resp.count = len(data)
+        return resp
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MockResponse":
+        resp = cls.__new__(cls)
+        resp.data = data
+        resp.count = 1
+        return resp
+
 
 class MockQueryBuilder:
     """
     Supports the chained query pattern used throughout the codebase:
         supabase.table("x").select("*").eq("id", "1").execute()
 
-    Every chaining method returns ``self`` so arbitrarily long chains work.
-    Call ``set_response`` to configure what ``execute()`` returns.
+    Any public attribute not defined here resolves to a method returning
+    ``self`` so arbitrarily long chains work.
+    Call ``set_response`` to configure what ``execute()`` returns, or
+    ``set_responses`` to queue one per successive ``execute()`` call.
     """
 
+    __slots__ = ("_default_data", "_default_response", "_responses", "_return_self")
+
     def __init__(self, default_data: list | None = None):
         self._default_data = default_data if default_data is not None else []
-        self._response: Optional[MockResponse] = None
+        # Shared across execute() calls; tests needing their own object use set_response
+        self._default_response = MockResponse.from_list(self._default_data)
+        self._responses: deque[MockResponse] = deque()
+        # One shared callable for every chain step instead of a new bound method per lookup
+        self._return_self = lambda *args, **kwargs: self
 
     # -- configuration helpers (used in tests) --
 
+    @staticmethod
+    def _make_response(data: list | dict | None, count: int | None) -> MockResponse:
+        if count is None and type(data) is list:
+            return MockResponse.from_list(data)
+        if count is None and type(data) is dict:
+            return MockResponse.from_dict(data)
+        return MockResponse(data=data, count=count)
+
     def set_response(self, data: list | dict | None = None, count: int | None = None):
         """Pre-configure what the next ``execute()`` will return."""
-        self._response = MockResponse(data=data, count=count)
-        return self
-
-    # -- chaining methods (all return self) --
-
-    def select(self, *args, **kwargs):
-        return self
-
-    def insert(self, *args, **kwargs):
-        return self
-
-    def update(self, *args, **kwargs):
-        return self
-
-    def upsert(self, *args, **kwargs):
+        self._responses.clear()
+        self._responses.append(self._make_response(data, count))
         return self
 
-    def delete(self, *args, **kwargs):
+    def set_responses(self, *data: list | dict | None):
+        """Queue one payload per successive ``execute()``; the default resumes after."""
+        self._responses.clear()
+        self._responses.extend(self._make_response(d, None) for d in data)
         return self
 
-    def eq(self, *args, **kwargs):
-        return self
-
-    def neq(self, *args, **kwargs):
-        return self
-
-    def gt(self, *args, **kwargs):
-        return self
-
-    def gte(self, *args, **kwargs):
-        return self
-
-    def lt(self, *args, **kwargs):
-        return self
-
-    def lte(self, *args, **kwargs):
-        return self
-
-    def like(self, *args, **kwargs):
-        return self
-
-    def ilike(self, *args, **kwargs):
-        return self
+    def reset(self) -> None:
+        """Drop any queued responses."""
+        self._responses.clear()
 
-    def or_(self, *args, **kwargs):
-        return self
-
-    def order(self, *args, **kwargs):
-        return self
-
-    def limit(self, *args, **kwargs):
-        return self
-
-    def range(self, *args, **kwargs):
-        return self
+    # -- chaining methods (all return self) --
 
-    def single(self, *args, **kwargs):
-        return self
+    def __getattr__(self, name: str):
+        # Only reached for names not defined on the class, i.e. the
+        # postgrest filter/modifier methods (select, eq, order, range, ...).
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._return_self
 
     # -- terminal method --
 
     def execute(self) -> MockResponse:
-        if self._response is not None:
-            resp = self._response
-            # Reset so next call on same builder uses default
-            self._response = None
-            return resp
-        return MockResponse(data=self._default_data)
+        if not self._responses:
+            return self._default_response
+        # Consumed, so later calls on the same builder fall back to the default
+        return self._responses.popleft()
 
 
 class MockSupabaseClient:
@@ -137,13 +137,29 @@ class MockSupabaseClient:
         # Then call the endpoint that internally does supabase.table(...).select(...).execute()
     """
 
+    __slots__ = ("query_builder", "auth")
+
     def __init__(self):
         self.query_builder = MockQueryBuilder()
-        self.auth = MagicMock()
+
+    def __getattr__(self, name: str):
+        # Build the auth mock on first use; most tests never touch it.
+        if name == "auth":
+            self.auth = MagicMock()
+            return self.auth
+        raise AttributeError(name)
 
     def table(self, name: str) -> MockQueryBuilder:
         return self.query_builder
 
+    def reset(self) -> None:
+        """Return to a freshly constructed state between tests."""
+        self.query_builder.reset()
+        try:
+            del self.auth
+        except AttributeError:
+            pass
+
 
 # ============================================================
 # Mock user
@@ -161,28 +177,57 @@ MOCK_ADMIN_USER = {
 # Fixtures
 # ============================================================
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def mock_supabase():
-    """Return a fresh MockSupabaseClient that can be configured per test."""
+    """One MockSupabaseClient for the session; reset before every test."""
     return MockSupabaseClient()
 
 
-@pytest.fixture()
-def test_app(mock_supabase):
+@pytest.fixture(autouse=True)
+def _reset_mock_supabase(mock_supabase):
+    mock_supabase.reset()
+
+
+def _mock_admin_user() -> dict:
+    return MOCK_ADMIN_USER
+
+
+@pytest.fixture(scope="session")
+def _dependency_overrides(mock_supabase):
+    """Install auth and database overrides once for the session."""
+    app.dependency_overrides[get_current_user] = _mock_admin_user
+    app.dependency_overrides[require_officer] = _mock_admin_user
+    app.dependency_overrides[require_admin] = _mock_admin_user
+    app.dependency_overrides[get_request_supabase] = lambda: mock_supabase
+    app.dependency_overrides[get_optional_db] = lambda: mock_supabase
+
+    yield
+
+    # Cleanup
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def test_app(_dependency_overrides):
     """
     Provide a ``TestClient`` with auth and database dependencies overridden.
 
     The mock supabase client is injected so tests can call
     ``mock_supabase.query_builder.set_response(...)`` to control DB results.
+    Client, app lifespan and overrides are set up once per session.
     """
-    # Override dependencies
-    app.dependency_overrides[get_current_user] = lambda: MOCK_ADMIN_USER
-    app.dependency_overrides[require_officer] = lambda: MOCK_ADMIN_USER
-    app.dependency_overrides[require_admin] = lambda: MOCK_ADMIN_USER
-    app.dependency_overrides[get_request_supabase] = lambda: mock_supabase
-
     with TestClient(app, raise_server_exceptions=False) as client:
         yield client
 
-    # Cleanup
-    app.dependency_overrides.clear()
+
+@pytest_asyncio.fixture()
+async def async_client(_dependency_overrides):
+    """
+    ``httpx.AsyncClient`` bound to the app in-process, for ``async def`` tests.
+
+    Same overrides as ``test_app``, but requests run on the test's event loop
+    through the real async request path instead of TestClient's portal thread.
+    """
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
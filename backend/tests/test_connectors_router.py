@@ -3,10 +3,21 @@ Tests for /api/connectors endpoints.
 """
 from unittest.mock import patch
 
+import pytest
+
 
 class TestConnectorTestEndpoint:
     """POST /api/connectors/{id}/test"""
 
+    @pytest.fixture(autouse=True)
+    def patched_connector(self):
+        """Stub credential decryption and the outbound check; tests set return values."""
+        with patch("backend.routers.connectors.decrypt_credentials") as decrypt, \
+             patch("backend.routers.connectors._run_connector_test") as run_test:
+            self._decrypt = decrypt
+            self._run = run_test
+            yield
+
     def test_returns_404_when_connector_missing(self, test_app, mock_supabase):
         mock_supabase.query_builder.set_response(data=None)
 
@@ -21,10 +32,10 @@ class TestConnectorTestEndpoint:
                 "encrypted_credentials": "encrypted",
             }
         )
+        self._decrypt.return_value = {"api_key": "abc"}
+        self._run.return_value = (True, 200, "ok")
 
-        with patch("backend.routers.connectors.decrypt_credentials", return_value={"api_key": "abc"}), \
-             patch("backend.routers.connectors._run_connector_test", return_value=(True, 200, "ok")):
-            response = test_app.post("/api/connectors/connector-1/test")
+        response = test_app.post("/api/connectors/connector-1/test")
 
         assert response.status_code == 200
         body = response.json()
@@ -39,10 +50,10 @@ class TestConnectorTestEndpoint:
                 "encrypted_credentials": "encrypted",
             }
         )
+        self._decrypt.return_value = {"api_key": "bad"}
+        self._run.return_value = (False, 502, "failed")
 
-        with patch("backend.routers.connectors.decrypt_credentials", return_value={"api_key": "bad"}), \
-             patch("backend.routers.connectors._run_connector_test", return_value=(False, 502, "failed")):
-            response = test_app.post("/api/connectors/connector-2/test")
+        response = test_app.post("/api/connectors/connector-2/test")
 
         assert response.status_code == 502
         assert response.json()["detail"] == "failed"
@@ -9,6 +9,7 @@ os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
 
 import pytest
 from datetime import date
+from types import MappingProxyType
 from pydantic import ValidationError
 
 from backend.models import (
@@ -29,38 +30,34 @@ from backend.models import (
 # Enum tests
 # ============================================================
 
+_EXPECTED_OPPORTUNITY_STATUS_VALUES = frozenset({"new", "reviewing", "qualified", "disqualified", "submitted"})
+_EXPECTED_SUBMISSION_STATUS_VALUES = frozenset({"draft", "pending_approval", "approved", "submitted", "rejected"})
+_EXPECTED_APPROVAL_STATUS_VALUES = frozenset({"pending", "legal_approved", "finance_approved", "complete", "rejected"})
+_EXPECTED_CONNECTOR_STATUS_VALUES = frozenset({"active", "warning", "revoked"})
+_EXPECTED_RUN_STATUS_VALUES = frozenset({"pending", "running", "success", "failed"})
+_EXPECTED_USER_ROLE_VALUES = frozenset({"admin", "contract_officer", "viewer"})
+
+
 class TestEnums:
     """Verify enum members match expected database values."""
 
     def test_opportunity_status_values(self):
-        expected = {"new", "reviewing", "qualified", "disqualified", "submitted"}
-        actual = {s.value for s in OpportunityStatus}
-        assert actual == expected
+        assert {s.value for s in OpportunityStatus} == _EXPECTED_OPPORTUNITY_STATUS_VALUES
 
     def test_submission_status_values(self):
-        expected = {"draft", "pending_approval", "approved", "submitted", "rejected"}
-        actual = {s.value for s in SubmissionStatus}
-        assert actual == expected
+        assert {s.value for s in SubmissionStatus} == _EXPECTED_SUBMISSION_STATUS_VALUES
 
     def test_approval_status_values(self):
-        expected = {"pending", "legal_approved", "finance_approved", "complete", "rejected"}
-        actual = {s.value for s in ApprovalStatus}
-        assert actual == expected
+        assert {s.value for s in ApprovalStatus} == _EXPECTED_APPROVAL_STATUS_VALUES
 
     def test_connector_status_values(self):
-        expected = {"active", "warning", "revoked"}
-        actual = {s.value for s in ConnectorStatus}
-        assert actual == expected
+        assert {s.value for s in ConnectorStatus} == _EXPECTED_CONNECTOR_STATUS_VALUES
 
     def test_run_status_values(self):
-        expected = {"pending", "running", "success", "failed"}
-        actual = {s.value for s in RunStatus}
-        assert actual == expected
+        assert {s.value for s in RunStatus} == _EXPECTED_RUN_STATUS_VALUES
 
     def test_user_role_values(self):
-        expected = {"admin", "contract_officer", "viewer"}
-        actual = {r.value for r in UserRole}
-        assert actual == expected
+        assert {r.value for r in UserRole} == _EXPECTED_USER_ROLE_VALUES
 
 
 # ============================================================
@@ -70,17 +67,17 @@ class TestEnums:
 class TestOpportunityCreate:
     """Validation for OpportunityCreate schema."""
 
+    _BASE = MappingProxyType({
+        "title": "Test Opportunity",
+        "agency": "Test Agency",
+        "external_ref": "REF-001",
+        "source": "sam_gov",
+        "posted_date": "2025-01-15",
+        "due_date": "2025-03-01",
+    })
+
     def _valid_payload(self, **overrides) -> dict:
-        base = {
-            "title": "Test Opportunity",
-            "agency": "Test Agency",
-            "external_ref": "REF-001",
-            "source": "sam_gov",
-            "posted_date": "2025-01-15",
-            "due_date": "2025-03-01",
-        }
-        base.update(overrides)
-        return base
+        return {**self._BASE, **overrides}
 
     def test_valid_minimal(self):
         opp = OpportunityCreate(**self._valid_payload())
@@ -189,14 +186,14 @@ class TestOpportunityUpdate:
 class TestSubmissionCreate:
     """Validation for SubmissionCreate schema."""
 
+    _BASE = MappingProxyType({
+        "opportunity_id": "opp-001",
+        "portal": "sam.gov",
+        "due_date": "2025-03-01",
+    })
+
     def _valid_payload(self, **overrides) -> dict:
-        base = {
-            "opportunity_id": "opp-001",
-            "portal": "sam.gov",
-            "due_date": "2025-03-01",
-        }
-        base.update(overrides)
-        return base
+        return {**self._BASE, **overrides}
 
     def test_valid_minimal(self):
         sub = SubmissionCreate(**self._valid_payload())
@@ -239,14 +236,14 @@ class TestSubmissionCreate:
 class TestConnectorCreate:
     """Validation for ConnectorCreate schema."""
 
+    _BASE = MappingProxyType({
+        "name": "sam_gov",
+        "auth_type": "api_key",
+        "credentials": {"api_key": "test-key-123"},
+    })
+
     def _valid_payload(self, **overrides) -> dict:
-        base = {
-            "name": "sam_gov",
-            "auth_type": "api_key",
-            "credentials": {"api_key": "test-key-123"},
-        }
-        base.update(overrides)
-        return base
+        return {**self._BASE, **overrides}
 
     def test_valid_minimal(self):
         conn = ConnectorCreate(**self._valid_payload())
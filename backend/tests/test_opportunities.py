@@ -1,11 +1,15 @@
 """
 Tests for the /api/opportunities router.
 """
+from collections import ChainMap
 from datetime import date, datetime
+from types import MappingProxyType
 
+import pytest
 
-# Reusable sample opportunity data
-SAMPLE_OPPORTUNITY = {
+
+# Reusable sample opportunity data (read-only; tests take copies via _opportunity)
+SAMPLE_OPPORTUNITY = MappingProxyType({
     "id": "opp-001",
     "external_ref": "SAM-2025-001",
     "source": "sam_gov",
@@ -24,27 +28,32 @@ SAMPLE_OPPORTUNITY = {
     "ai_summary": None,
     "created_at": "2025-01-15T00:00:00Z",
     "updated_at": "2025-01-15T00:00:00Z",
-}
+})
 
-SAMPLE_OPPORTUNITY_2 = {
-    **SAMPLE_OPPORTUNITY,
+SAMPLE_OPPORTUNITY_2 = MappingProxyType(ChainMap({
     "id": "opp-002",
     "external_ref": "GOVCON-2025-042",
     "source": "govcon",
     "title": "Cybersecurity Assessment Services",
     "agency": "Department of Homeland Security",
-}
+}, SAMPLE_OPPORTUNITY))
+
+
+def _opportunity(base=SAMPLE_OPPORTUNITY, **overrides) -> dict:
+    """Plain-dict copy of a sample with overrides; mock DB rows must be real dicts."""
+    return dict(ChainMap(overrides, base))
 
 
 class TestListOpportunities:
     """GET /api/opportunities"""
 
-    def test_returns_list(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_returns_list(self, async_client, mock_supabase):
         mock_supabase.query_builder.set_response(
-            data=[SAMPLE_OPPORTUNITY, SAMPLE_OPPORTUNITY_2],
+            data=[_opportunity(), _opportunity(SAMPLE_OPPORTUNITY_2)],
             count=2,
         )
-        response = test_app.get("/api/opportunities")
+        response = await async_client.get("/api/opportunities")
         assert response.status_code == 200
 
         body = response.json()
@@ -53,83 +62,79 @@ class TestListOpportunities:
         assert len(body["data"]) == 2
         assert body["total"] == 2
 
-    def test_returns_empty_list(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_returns_empty_list(self, async_client, mock_supabase):
         mock_supabase.query_builder.set_response(data=[], count=0)
-        response = test_app.get("/api/opportunities")
+        response = await async_client.get("/api/opportunities")
         assert response.status_code == 200
 
         body = response.json()
         assert body["data"] == []
         assert body["total"] == 0
 
-    def test_handles_status_filter(self, test_app, mock_supabase):
-        mock_supabase.query_builder.set_response(data=[SAMPLE_OPPORTUNITY], count=1)
-        response = test_app.get("/api/opportunities?status=new")
+    @pytest.mark.asyncio
+    async def test_handles_status_filter(self, async_client, mock_supabase):
+        mock_supabase.query_builder.set_response(data=[_opportunity()], count=1)
+        response = await async_client.get("/api/opportunities?status=new")
         assert response.status_code == 200
         assert len(response.json()["data"]) == 1
 
-    def test_handles_source_filter(self, test_app, mock_supabase):
-        mock_supabase.query_builder.set_response(data=[SAMPLE_OPPORTUNITY], count=1)
-        response = test_app.get("/api/opportunities?source=sam_gov")
+    @pytest.mark.asyncio
+    async def test_handles_source_filter(self, async_client, mock_supabase):
+        mock_supabase.query_builder.set_response(data=[_opportunity()], count=1)
+        response = await async_client.get("/api/opportunities?source=sam_gov")
         assert response.status_code == 200
 
-    def test_handles_pagination(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_handles_pagination(self, async_client, mock_supabase):
         mock_supabase.query_builder.set_response(data=[], count=0)
-        response = test_app.get("/api/opportunities?page=2&limit=10")
+        response = await async_client.get("/api/opportunities?page=2&limit=10")
         assert response.status_code == 200
 
         body = response.json()
         assert body["page"] == 2
         assert body["limit"] == 10
 
-    def test_rejects_invalid_min_fit_score(self, test_app):
-        response = test_app.get("/api/opportunities?min_fit_score=200")
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_min_fit_score(self, async_client):
+        response = await async_client.get("/api/opportunities?min_fit_score=200")
         assert response.status_code == 422
 
 
 class TestGetOpportunity:
     """GET /api/opportunities/{id}"""
 
-    def test_returns_single(self, test_app, mock_supabase):
-        mock_supabase.query_builder.set_response(data=SAMPLE_OPPORTUNITY)
-        response = test_app.get("/api/opportunities/opp-001")
+    @pytest.mark.asyncio
+    async def test_returns_single(self, async_client, mock_supabase):
+        mock_supabase.query_builder.set_response(data=_opportunity())
+        response = await async_client.get("/api/opportunities/opp-001")
         assert response.status_code == 200
 
         body = response.json()
         assert body["id"] == "opp-001"
         assert body["title"] == "Cloud Infrastructure Modernization"
 
-    def test_returns_404_when_not_found(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_returns_404_when_not_found(self, async_client, mock_supabase):
         mock_supabase.query_builder.set_response(data=None)
-        response = test_app.get("/api/opportunities/nonexistent")
+        response = await async_client.get("/api/opportunities/nonexistent")
         assert response.status_code == 404
 
 
 class TestCreateOpportunity:
     """POST /api/opportunities"""
 
-    def test_creates_opportunity(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_creates_opportunity(self, async_client, mock_supabase):
         # First call: duplicate check (select) returns empty
         # Second call: insert returns the created record
-        created = {
-            **SAMPLE_OPPORTUNITY,
-            "id": "opp-new",
-            "created_at": "2025-01-20T00:00:00Z",
-            "updated_at": "2025-01-20T00:00:00Z",
-        }
-
-        call_count = {"n": 0}
-        from backend.tests.conftest import MockResponse
-
-        def side_effect_execute():
-            call_count["n"] += 1
-            if call_count["n"] == 1:
-                # Duplicate check -- no existing record
-                return MockResponse(data=[], count=0)
-            # Insert result
-            return MockResponse(data=[created], count=1)
+        created = _opportunity(
+            id="opp-new",
+            created_at="2025-01-20T00:00:00Z",
+            updated_at="2025-01-20T00:00:00Z",
+        )
 
-        mock_supabase.query_builder.execute = side_effect_execute
+        mock_supabase.query_builder.set_responses([], [created])
 
         payload = {
             "title": "Cloud Infrastructure Modernization",
@@ -139,10 +144,11 @@ class TestCreateOpportunity:
             "posted_date": "2025-01-15",
             "due_date": "2025-03-01",
         }
-        response = test_app.post("/api/opportunities", json=payload)
+        response = await async_client.post("/api/opportunities", json=payload)
         assert response.status_code == 201
 
-    def test_rejects_duplicate(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_rejects_duplicate(self, async_client, mock_supabase):
         # Duplicate check returns an existing record
         mock_supabase.query_builder.set_response(data=[{"id": "opp-001"}])
         payload = {
@@ -153,37 +159,29 @@ class TestCreateOpportunity:
             "posted_date": "2025-01-15",
             "due_date": "2025-03-01",
         }
-        response = test_app.post("/api/opportunities", json=payload)
+        response = await async_client.post("/api/opportunities", json=payload)
         assert response.status_code == 409
 
 
 class TestUpdateOpportunity:
     """PATCH /api/opportunities/{id}"""
 
-    def test_updates_opportunity(self, test_app, mock_supabase):
-        updated = {**SAMPLE_OPPORTUNITY, "fit_score": 95}
-
-        call_count = {"n": 0}
-
-        def side_effect_execute():
-            call_count["n"] += 1
-            if call_count["n"] == 1:
-                # Existence check
-                return type("MockResponse", (), {"data": [{"id": "opp-001"}], "count": 1})()
-            # Update result
-            return type("MockResponse", (), {"data": [updated], "count": 1})()
+    @pytest.mark.asyncio
+    async def test_updates_opportunity(self, async_client, mock_supabase):
+        updated = _opportunity(fit_score=95)
 
-        mock_supabase.query_builder.execute = side_effect_execute
+        mock_supabase.query_builder.set_responses([{"id": "opp-001"}], [updated])
 
-        response = test_app.patch(
+        response = await async_client.patch(
             "/api/opportunities/opp-001",
             json={"fit_score": 95},
         )
         assert response.status_code == 200
 
-    def test_returns_404_for_missing(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_returns_404_for_missing(self, async_client, mock_supabase):
         mock_supabase.query_builder.set_response(data=[])
-        response = test_app.patch(
+        response = await async_client.patch(
             "/api/opportunities/nonexistent",
             json={"fit_score": 50},
         )
@@ -193,15 +191,15 @@ class TestUpdateOpportunity:
 class TestDisqualifyOpportunity:
     """PATCH /api/opportunities/{id}/disqualify"""
 
-    def test_disqualifies(self, test_app, mock_supabase):
-        disqualified = {
-            **SAMPLE_OPPORTUNITY,
-            "status": "disqualified",
-            "disqualified_reason": "Out of scope",
-        }
+    @pytest.mark.asyncio
+    async def test_disqualifies(self, async_client, mock_supabase):
+        disqualified = _opportunity(
+            status="disqualified",
+            disqualified_reason="Out of scope",
+        )
         mock_supabase.query_builder.set_response(data=[disqualified])
 
-        response = test_app.patch(
+        response = await async_client.patch(
             "/api/opportunities/opp-001/disqualify?reason=Out%20of%20scope",
         )
         assert response.status_code == 200
@@ -209,7 +207,8 @@ class TestDisqualifyOpportunity:
         body = response.json()
         assert body["status"] == "disqualified"
 
-    def test_disqualify_returns_404(self, test_app, mock_supabase):
+    @pytest.mark.asyncio
+    async def test_disqualify_returns_404(self, async_client, mock_supabase):
         mock_supabase.query_builder.set_response(data=[])
-        response = test_app.patch("/api/opportunities/nonexistent/disqualify")
+        response = await async_client.patch("/api/opportunities/nonexistent/disqualify")
         assert response.status_code == 404
@@ -0,0 +1,242 @@
+"""
+Tests for the pipeline orchestrator.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from postgrest.exceptions import APIError
+
+from backend.workflows import pipeline
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches(monkeypatch):
+    monkeypatch.setattr(pipeline, "_CFG_CACHE", None)
+    monkeypatch.setattr(pipeline, "_PROFILE_CACHE", None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable ``time.monotonic`` as seen by the pipeline module."""
+    now = [1000.0]
+    monkeypatch.setattr(pipeline, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+# ============================================================
+# Config cache
+# ============================================================
+
+class TestPipelineConfigCache:
+    def test_config_is_cached_within_ttl(self, monkeypatch, clock):
+        load = MagicMock(return_value={"autonomy_mode": "supervised", "fit_threshold": 70})
+        monkeypatch.setattr(pipeline, "_load_pipeline_config", load)
+
+        first = pipeline.get_pipeline_config()
+        clock[0] += pipeline._CONFIG_TTL_SECONDS - 1
+        second = pipeline.get_pipeline_config()
+
+        assert first == second
+        assert first["mode"] == "supervised"
+        assert first["fit_threshold"] == 70
+        load.assert_called_once()
+
+    def test_config_reloads_after_ttl(self, monkeypatch, clock):
+        load = MagicMock(return_value={"autonomy_mode": "supervised"})
+        monkeypatch.setattr(pipeline, "_load_pipeline_config", load)
+
+        pipeline.get_pipeline_config()
+        clock[0] += pipeline._CONFIG_TTL_SECONDS + 1
+        pipeline.get_pipeline_config()
+
+        assert load.call_count == 2
+
+    def test_empty_config_is_not_cached(self, monkeypatch, clock):
+        load = MagicMock(side_effect=[{}, {"autonomy_mode": "autonomous"}])
+        monkeypatch.setattr(pipeline, "_load_pipeline_config", load)
+
+        assert pipeline.get_pipeline_config()["mode"] == pipeline.DEFAULT_MODE
+        assert pipeline.get_pipeline_config()["mode"] == "autonomous"
+
+    def test_invalidate_caches_forces_reload(self, monkeypatch, clock):
+        load = MagicMock(return_value={"autonomy_mode": "supervised"})
+        monkeypatch.setattr(pipeline, "_load_pipeline_config", load)
+
+        pipeline.get_pipeline_config()
+        pipeline.invalidate_caches()
+        pipeline.get_pipeline_config()
+
+        assert load.call_count == 2
+
+
+class TestSavePipelineConfig:
+    @pytest.fixture
+    def db(self, monkeypatch):
+        client = MagicMock()
+        monkeypatch.setattr("backend.database.get_supabase_client", lambda: client)
+        return client
+
+    def test_merges_through_rpc(self, db, monkeypatch):
+        monkeypatch.setattr(pipeline, "_CFG_CACHE", (0.0, {"autonomy_mode": "manual"}))
+
+        pipeline.save_pipeline_config({"fit_threshold": 75})
+
+        db.rpc.assert_called_once_with("upsert_pipeline_config", {"patch": {"fit_threshold": 75}})
+        db.table.assert_not_called()
+        assert pipeline._CFG_CACHE is None
+
+    def test_missing_rpc_falls_back_to_table_upsert(self, db):
+        db.rpc.return_value.execute.side_effect = APIError(
+            {"code": "PGRST202", "message": "Could not find the function public.upsert_pipeline_config(patch)"}
+        )
+
+        pipeline.save_pipeline_config({"autonomy_mode": "supervised"})
+
+        db.table.assert_called_once_with("system_settings")
+        db.table.return_value.upsert.assert_called_once_with(
+            {"key": "pipeline_config", "value": {"autonomy_mode": "supervised"}}, on_conflict="key"
+        )
+
+    def test_other_rpc_errors_are_raised(self, db):
+        db.rpc.return_value.execute.side_effect = APIError(
+            {"code": "42501", "message": "permission denied for table system_settings"}
+        )
+
+        with pytest.raises(APIError):
+            pipeline.save_pipeline_config({"fit_threshold": 75})
+
+        db.table.assert_not_called()
+
+
+# ============================================================
+# run_pipeline_batch
+# ============================================================
+
+class TestRunPipelineBatch:
+    @pytest.fixture(autouse=True)
+    def _config(self, monkeypatch):
+        monkeypatch.setattr(pipeline, "get_pipeline_config", MagicMock(return_value={}))
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_does_nothing(self, monkeypatch):
+        run = MagicMock()
+        monkeypatch.setattr(pipeline, "run_pipeline", run)
+
+        assert await pipeline.run_pipeline_batch([]) == []
+        run.assert_not_called()
+        pipeline.get_pipeline_config.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_runs_are_skipped(self, monkeypatch):
+        async def fake_run(opportunity, fit_score, triggered_by_user_id=None):
+            if opportunity["id"] == "bad":
+                raise RuntimeError("boom")
+            return {"opportunity_id": opportunity["id"], "actions": [{"type": "submission_created"}]}
+
+        monkeypatch.setattr(pipeline, "run_pipeline", fake_run)
+
+        results = await pipeline.run_pipeline_batch([({"id": "a"}, 90), ({"id": "bad"}, 90), ({"id": "b"}, 85)])
+
+        assert [r["opportunity_id"] for r in results] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_runs_are_skipped(self, monkeypatch):
+        async def fake_run(opportunity, fit_score, triggered_by_user_id=None):
+            if opportunity["id"] == "cancelled":
+                raise asyncio.CancelledError()
+            return {"opportunity_id": opportunity["id"], "actions": []}
+
+        monkeypatch.setattr(pipeline, "run_pipeline", fake_run)
+
+        results = await pipeline.run_pipeline_batch([({"id": "cancelled"}, 90), ({"id": "a"}, 90)])
+
+        assert [r["opportunity_id"] for r in results] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, monkeypatch):
+        in_flight = 0
+        peak = 0
+
+        async def fake_run(opportunity, fit_score, triggered_by_user_id=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"opportunity_id": opportunity["id"], "actions": []}
+
+        monkeypatch.setattr(pipeline, "run_pipeline", fake_run)
+
+        results = await pipeline.run_pipeline_batch([({"id": str(i)}, 90) for i in range(10)], concurrency=3)
+
+        assert len(results) == 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_passes_triggering_user(self, monkeypatch):
+        seen = []
+
+        async def fake_run(opportunity, fit_score, triggered_by_user_id=None):
+            seen.append((opportunity["id"], fit_score, triggered_by_user_id))
+            return {"opportunity_id": opportunity["id"], "actions": []}
+
+        monkeypatch.setattr(pipeline, "run_pipeline", fake_run)
+
+        await pipeline.run_pipeline_batch([({"id": "a"}, 91)], triggered_by_user_id="user-1")
+
+        assert seen == [("a", 91, "user-1")]
+
+
+# ============================================================
+# Auto-created submissions
+# ============================================================
+
+class TestAutoCreateSubmission:
+    OPPORTUNITY = {"id": "opp-1", "title": "Cloud Modernization", "source": "sam.gov", "due_date": "2025-03-01"}
+
+    @pytest.fixture
+    def db(self, monkeypatch):
+        client = MagicMock()
+        monkeypatch.setattr("backend.database.get_supabase_client", lambda: client)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_uses_rpc_result(self, db):
+        db.rpc.return_value.execute.return_value = MagicMock(data="sub-1")
+
+        assert await pipeline._auto_create_submission(self.OPPORTUNITY, "user-1") == "sub-1"
+
+        assert db.rpc.call_args.args[0] == "auto_create_submission"
+        assert db.rpc.call_args.args[1]["p_opportunity_id"] == "opp-1"
+        assert db.rpc.call_args.args[1]["p_owner_id"] == "user-1"
+        db.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rpc_without_owner_returns_none(self, db):
+        db.rpc.return_value.execute.return_value = MagicMock(data=None)
+
+        assert await pipeline._auto_create_submission(self.OPPORTUNITY, None) is None
+
+    @pytest.mark.asyncio
+    async def test_missing_rpc_falls_back_to_table_calls(self, db):
+        db.rpc.return_value.execute.side_effect = APIError(
+            {"code": "PGRST202", "message": "Could not find the function public.auto_create_submission"}
+        )
+        existing = db.table.return_value.select.return_value.eq.return_value
+        existing.execute.return_value = MagicMock(data=[{"id": "sub-existing"}])
+
+        assert await pipeline._auto_create_submission(self.OPPORTUNITY, "user-1") == "sub-existing"
+
+        db.table.assert_called_with("submissions")
+
+    @pytest.mark.asyncio
+    async def test_other_rpc_errors_do_not_fall_back(self, db):
+        db.rpc.return_value.execute.side_effect = APIError(
+            {"code": "57014", "message": "canceling statement due to statement timeout"}
+        )
+
+        assert await pipeline._auto_create_submission(self.OPPORTUNITY, "user-1") is None
+
+        db.table.assert_not_called()
@@ -0,0 +1,120 @@
+"""
+Tests for BaseConnector.persist_bulk (bulk opportunity upsert).
+"""
+from unittest.mock import MagicMock
+
+import pytest
+from postgrest.exceptions import APIError
+
+from backend.scrapers.base import BaseConnector
+
+
+class _Connector(BaseConnector):
+    name = "test"
+    source = "test"
+
+    async def fetch_opportunities(self, since=None):
+        return []
+
+    def normalize(self, raw_data):
+        return raw_data
+
+
+def _client(rpc_data=None, rpc_error=None, table_data=None) -> MagicMock:
+    """Supabase client whose RPC returns ``rpc_data`` or raises ``rpc_error``."""
+    client = MagicMock()
+    rpc_execute = client.rpc.return_value.execute
+    if rpc_error is not None:
+        rpc_execute.side_effect = rpc_error
+    else:
+        rpc_execute.return_value = MagicMock(data=rpc_data)
+    client.table.return_value.upsert.return_value.execute.return_value = MagicMock(data=table_data)
+    return client
+
+
+class TestPersistBulk:
+    @pytest.mark.asyncio
+    async def test_returns_rpc_rows(self):
+        rows = [{"inserted": True, "opportunity": {"id": "1", "external_ref": "A"}}]
+        client = _client(rpc_data=rows)
+
+        async with _Connector() as connector:
+            result = await connector.persist_bulk(client, [{"external_ref": "A"}])
+
+        assert result == rows
+        client.rpc.assert_called_once_with("bulk_upsert_opportunities", {"p": [{"external_ref": "A"}]})
+        client.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dedupes_and_drops_rows_without_external_ref(self):
+        client = _client(rpc_data=[])
+        opportunities = [
+            {"external_ref": "A", "title": "first"},
+            {"title": "no ref"},
+            {"external_ref": "", "title": "empty ref"},
+            {"external_ref": "A", "title": "second"},
+            {"external_ref": "B", "title": "other"},
+        ]
+
+        async with _Connector() as connector:
+            await connector.persist_bulk(client, opportunities)
+
+        sent = client.rpc.call_args.args[1]["p"]
+        assert sent == [
+            {"external_ref": "A", "title": "second"},
+            {"external_ref": "B", "title": "other"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_sends_only_persisted_columns(self):
+        client = _client(rpc_data=[])
+
+        async with _Connector() as connector:
+            await connector.persist_bulk(client, [{"external_ref": "A", "title": "t", "scraper_note": "x"}])
+
+        assert client.rpc.call_args.args[1]["p"] == [{"external_ref": "A", "title": "t"}]
+
+    @pytest.mark.asyncio
+    async def test_no_external_refs_skips_database(self):
+        client = _client(rpc_data=[])
+
+        async with _Connector() as connector:
+            assert await connector.persist_bulk(client, [{"title": "no ref"}]) == []
+
+        client.rpc.assert_not_called()
+        client.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("error", [
+        {"code": "PGRST202", "message": "Could not find the function public.bulk_upsert_opportunities(p)"},
+        {"code": "42883", "message": "function bulk_upsert_opportunities(jsonb) does not exist"},
+    ])
+    async def test_missing_rpc_falls_back_to_table_upsert(self, error):
+        new = {"id": "1", "external_ref": "A", "created_at": "t0", "updated_at": "t0"}
+        existing = {"id": "2", "external_ref": "B", "created_at": "t0", "updated_at": "t1"}
+        client = _client(rpc_error=APIError(error), table_data=[new, existing])
+
+        async with _Connector() as connector:
+            result = await connector.persist_bulk(
+                client, [{"external_ref": "A"}, {"external_ref": "B", "scraper_note": "x"}]
+            )
+
+        client.table.assert_called_once_with("opportunities")
+        client.table.return_value.upsert.assert_called_once_with(
+            [{"external_ref": "A"}, {"external_ref": "B"}], on_conflict="external_ref"
+        )
+        assert result == [
+            {"inserted": True, "opportunity": new},
+            {"inserted": False, "opportunity": existing},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_other_rpc_errors_are_raised(self):
+        error = APIError({"code": "23502", "message": 'null value in column "title" violates not-null constraint'})
+        client = _client(rpc_error=error)
+
+        async with _Connector() as connector:
+            with pytest.raises(APIError):
+                await connector.persist_bulk(client, [{"external_ref": "A"}])
+
+        client.table.assert_not_called()
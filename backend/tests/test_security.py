@@ -1,10 +1,9 @@
 """
-Tests for security utilities: RateLimiter and Fernet vault encryption.
+Tests for security utilities: RateLimiter, Fernet vault encryption and audit log signing.
 """
 import os
 import time
 from unittest.mock import patch
-from datetime import datetime, timezone
 
 import pytest
 
@@ -16,7 +15,7 @@ from backend.dependencies import RateLimiter
 # ============================================================
 
 class TestRateLimiter:
-    """Unit tests for the sliding-window in-memory RateLimiter."""
+    """Unit tests for the token-bucket in-memory RateLimiter."""
 
     @pytest.mark.asyncio
     async def test_allows_under_limit(self):
@@ -45,14 +44,13 @@ class TestRateLimiter:
 
     @pytest.mark.asyncio
     async def test_window_slides_old_entries_expire(self):
-        """Entries older than 60 seconds should be pruned."""
+        """An empty bucket last refilled >60 seconds ago is full again."""
         limiter = RateLimiter(requests_per_minute=2)
 
-        # Manually inject timestamps that are >60 seconds old
-        old_ts = datetime.now(timezone.utc).timestamp() - 120.0
-        limiter._requests["user-1"] = [old_ts, old_ts]
+        # Manually inject a drained bucket whose last refill is 120 seconds old
+        limiter._shard_for("user-1")["user-1"] = (0.0, time.monotonic() - 120.0)
 
-        # Even though there are 2 entries, they are expired so the check passes
+        # Even though the bucket was empty, it has refilled so the check passes
         assert await limiter.check("user-1") is True
 
     @pytest.mark.asyncio
@@ -62,13 +60,25 @@ class TestRateLimiter:
         assert await limiter.check("user-1") is True
         assert await limiter.check("user-1") is False  # blocked
 
-        # Simulate time passing by shifting all timestamps back
-        limiter._requests["user-1"] = [
-            t - 61.0 for t in limiter._requests["user-1"]
-        ]
+        # Simulate time passing by shifting the last refill back
+        shard = limiter._shard_for("user-1")
+        tokens, last_refill = shard["user-1"]
+        shard["user-1"] = (tokens, last_refill - 61.0)
 
         assert await limiter.check("user-1") is True
 
+    @pytest.mark.asyncio
+    async def test_sweep_drops_idle_buckets(self):
+        limiter = RateLimiter(requests_per_minute=2)
+        shard = limiter._shard_for("idle")
+        shard["idle"] = (0.0, time.monotonic() - 61.0)
+        shard["busy"] = (0.0, time.monotonic())
+
+        limiter._sweep(shard, time.monotonic())
+
+        assert "idle" not in shard
+        assert "busy" in shard
+
 
 # ============================================================
 # Fernet Vault (encrypt / decrypt round-trip)
@@ -77,23 +87,24 @@ class TestRateLimiter:
 class TestVaultEncryption:
     """Test encrypt_credentials / decrypt_credentials from backend.security.vault."""
 
+    @pytest.fixture(scope="class")
+    def _vault_key(self):
+        """One Fernet key for the whole class, so vault's per-key Fernet cache is reused."""
+        from cryptography.fernet import Fernet
+
+        return Fernet.generate_key().decode("utf-8")
+
     @pytest.fixture(autouse=True)
-    def _set_vault_key(self):
-        """Generate and set a valid Fernet key for the duration of each test.
+    def _set_vault_key(self, _vault_key, monkeypatch):
+        """Point settings at the shared key for the duration of each test.
 
         vault.py imports ``settings`` at module level, so we patch the
         VAULT_ENCRYPTION_KEY attribute directly on the settings object that
         vault.py already holds a reference to.
         """
-        from cryptography.fernet import Fernet
         from backend.config import settings as cfg
 
-        key = Fernet.generate_key().decode("utf-8")
-        original = cfg.VAULT_ENCRYPTION_KEY
-
-        cfg.VAULT_ENCRYPTION_KEY = key
-        yield
-        cfg.VAULT_ENCRYPTION_KEY = original
+        monkeypatch.setattr(cfg, "VAULT_ENCRYPTION_KEY", _vault_key)
 
     def test_round_trip_simple(self):
         from backend.security.vault import encrypt_credentials, decrypt_credentials
@@ -136,15 +147,120 @@ class TestVaultEncryption:
         enc2 = encrypt_credentials({"key": "value2"})
         assert enc1 != enc2
 
-    def test_missing_vault_key_raises(self):
+    def test_legacy_double_base64_value_round_trips(self, _vault_key):
+        """Values stored with the old outer base64 layer still decrypt."""
+        import base64
+        import json
+
+        from cryptography.fernet import Fernet
+        from backend.security.vault import decrypt_credentials, is_legacy_token
+
+        original = {"username": "legacy-user", "password": "old-p@ss"}
+        token = Fernet(_vault_key.encode("utf-8")).encrypt(json.dumps(original).encode("utf-8"))
+        legacy = base64.urlsafe_b64encode(token).decode("utf-8")
+
+        assert is_legacy_token(legacy)
+        assert decrypt_credentials(legacy) == original
+
+    def test_new_value_is_not_legacy(self):
+        from backend.security.vault import encrypt_credentials, is_legacy_token
+
+        assert not is_legacy_token(encrypt_credentials({"key": "value"}))
+
+    def test_missing_vault_key_raises(self, monkeypatch):
         """When VAULT_ENCRYPTION_KEY is empty, get_fernet should raise."""
         from backend.security.vault import get_fernet
         from backend.config import settings as cfg
 
-        original = cfg.VAULT_ENCRYPTION_KEY
-        cfg.VAULT_ENCRYPTION_KEY = ""
-        try:
-            with pytest.raises(ValueError, match="VAULT_ENCRYPTION_KEY not configured"):
-                get_fernet()
-        finally:
-            cfg.VAULT_ENCRYPTION_KEY = original
+        monkeypatch.setattr(cfg, "VAULT_ENCRYPTION_KEY", "")
+        with pytest.raises(ValueError, match="VAULT_ENCRYPTION_KEY not configured"):
+            get_fernet()
+
+
+# ============================================================
+# Audit log signing
+# ============================================================
+
+class TestAuditSigning:
+    """Test sign_audit_log / verify_audit_log from backend.security.audit."""
+
+    ROW = {
+        "submission_id": "sub-1",
+        "submission_ref": "SAM-001",
+        "portal": "sam.gov",
+        "action": "SUBMIT",
+        "status": "CONFIRMED",
+        "metadata": {"run_id": "run-1", "steps": ["login", "upload"]},
+    }
+
+    def _legacy_hash(self, row: dict) -> str:
+        """HMAC-SHA256 as computed before signature_alg existed."""
+        import hashlib
+        import hmac
+        import json
+
+        from backend.config import settings as cfg
+
+        canonical = json.dumps(row, sort_keys=True, default=str).encode("utf-8")
+        return hmac.new(cfg.AUDIT_SIGNING_KEY.encode("utf-8"), canonical, hashlib.sha256).hexdigest()
+
+    def test_legacy_row_read_back_with_null_alg_verifies(self):
+        from backend.security.audit import verify_audit_log
+
+        stored = {**self.ROW, "signature_alg": None}
+        stored["confirmation_hash"] = self._legacy_hash(self.ROW)
+
+        assert verify_audit_log(stored, stored["confirmation_hash"])
+
+    def test_blake2b_row_verifies(self):
+        from backend.security.audit import SIGNATURE_ALG, sign_audit_log, verify_audit_log
+
+        row = {**self.ROW, "signature_alg": SIGNATURE_ALG}
+        row["confirmation_hash"] = sign_audit_log(row)
+
+        assert len(row["confirmation_hash"]) == 64
+        assert row["confirmation_hash"] != self._legacy_hash(self.ROW)
+        assert verify_audit_log(row, row["confirmation_hash"])
+
+    def test_tampered_row_fails(self):
+        from backend.security.audit import SIGNATURE_ALG, sign_audit_log, verify_audit_log
+
+        row = {**self.ROW, "signature_alg": SIGNATURE_ALG}
+        stored_hash = sign_audit_log(row)
+
+        assert not verify_audit_log({**row, "status": "FAILED"}, stored_hash)
+
+    def test_sign_canonical_matches_sign_audit_log(self):
+        from backend.security.audit import (
+            SIGNATURE_ALG, _canonicalize, sign_audit_log, sign_canonical,
+        )
+
+        row = {**self.ROW, "signature_alg": SIGNATURE_ALG}
+        assert sign_canonical(_canonicalize(row)) == sign_audit_log(row)
+        assert sign_canonical(_canonicalize(self.ROW), None) == self._legacy_hash(self.ROW)
+
+    @pytest.mark.parametrize("stored_hash", ["", "not-hex", "abc", None])
+    def test_malformed_stored_hash_fails(self, stored_hash):
+        from backend.security.audit import SIGNATURE_ALG, verify_audit_log
+
+        assert not verify_audit_log({**self.ROW, "signature_alg": SIGNATURE_ALG}, stored_hash)
+
+    def test_stored_hash_is_case_insensitive_hex(self):
+        from backend.security.audit import SIGNATURE_ALG, sign_audit_log, verify_audit_log
+
+        row = {**self.ROW, "signature_alg": SIGNATURE_ALG}
+        assert verify_audit_log(row, sign_audit_log(row).upper())
+
+    def test_verify_audit_logs_checks_each_row(self):
+        from backend.security.audit import SIGNATURE_ALG, sign_audit_log, verify_audit_logs
+
+        good = {**self.ROW, "signature_alg": SIGNATURE_ALG}
+        good["confirmation_hash"] = sign_audit_log(good)
+        legacy = {**self.ROW, "signature_alg": None, "confirmation_hash": self._legacy_hash(self.ROW)}
+        tampered = {**good, "portal": "other"}
+        malformed = {**good, "confirmation_hash": "zz"}
+        missing = {k: v for k, v in good.items() if k != "confirmation_hash"}
+
+        assert verify_audit_logs([good, legacy, tampered, malformed, missing]) == [
+            True, True, False, False, False,
+        ]
@@ -9,11 +9,12 @@ Three modes (stored in system_settings.autonomy_mode):
   autonomous  – Auto-create draft AND trigger AI proposal generation for
                 fit ≥ auto_threshold (default 90) AND value ≤ max_auto_value.
 
-Called from:
+Called from (via run_pipeline_batch):
   - backend/routers/opportunities.py  (after manual sync auto-qualification)
   - backend/tasks/discovery.py        (after scheduled discovery auto-qualification)
 """
 import asyncio
+import time
 from datetime import datetime, timezone
 from typing import Optional
 import structlog
@@ -27,6 +28,37 @@ DEFAULT_FIT_THRESHOLD = 80        # supervised: auto-draft above this
 DEFAULT_AUTO_THRESHOLD = 90       # autonomous: also auto-generate proposal above this
 DEFAULT_MAX_AUTO_VALUE = 500_000  # autonomous: only for contracts ≤ this value (USD)
 
+# run_pipeline reads the config once per opportunity; a discovery batch would
+# otherwise re-query system_settings for every row. Saves in this process
+# invalidate immediately; other workers pick changes up within the TTL.
+_CONFIG_TTL_SECONDS = 30.0
+_CFG_CACHE: Optional[tuple[float, dict]] = None
+
+# Pipelines mostly wait on Supabase / the LLM; cap how many run at once so a
+# large discovery batch doesn't trip provider rate limits.
+_PIPELINE_CONCURRENCY = 8
+
+# Source spellings that mean SAM.gov (the SAM connector itself writes "sam.gov")
+_SAM_SOURCES = frozenset({"sam", "SAM", "Sam", "sam.gov", "SAM.gov", "sam_gov"})
+
+# Checklist every auto-drafted submission starts with; keep in sync with the
+# auto_create_submission() SQL function (migration 17).
+_DEFAULT_TASK_TEMPLATES = (
+    {"title": "Complete Checklist", "subtitle": "Review and complete all required fields"},
+    {"title": "Upload Documents", "subtitle": "Attach all required documents"},
+    {"title": "Legal Review", "subtitle": "Obtain legal department approval", "locked": True},
+    {"title": "Finance Review", "subtitle": "Obtain finance department approval", "locked": True},
+    {"title": "Final Review", "subtitle": "Complete final review before submission", "locked": True},
+)
+
+# Company profile for autonomous proposal generation: (monotonic time, profile).
+# Cleared by invalidate_caches() when the profile or pipeline config is saved.
+_PROFILE_TTL_SECONDS = 120.0
+_PROFILE_CACHE: Optional[tuple[float, dict]] = None
+
+# [monotonic time, ISO string]; refreshed at most once a second
+_NOW_CACHE: list = [float("-inf"), ""]
+
 
 def _load_pipeline_config() -> dict:
     """
@@ -46,9 +78,21 @@ def _load_pipeline_config() -> dict:
     return {}
 
 
+def _cached_pipeline_config() -> dict:
+    """``_load_pipeline_config`` behind a short TTL; empty results (missing/failed) aren't cached."""
+    global _CFG_CACHE
+    now = time.monotonic()
+    if _CFG_CACHE is not None and now - _CFG_CACHE[0] < _CONFIG_TTL_SECONDS:
+        return _CFG_CACHE[1]
+    cfg = _load_pipeline_config()
+    if cfg:
+        _CFG_CACHE = (now, cfg)
+    return cfg
+
+
 def get_pipeline_config() -> dict:
     """Return full pipeline config with defaults filled in."""
-    cfg = _load_pipeline_config()
+    cfg = _cached_pipeline_config()
     return {
         "mode": cfg.get("autonomy_mode", DEFAULT_MODE),
         "fit_threshold": int(cfg.get("fit_threshold", DEFAULT_FIT_THRESHOLD)),
@@ -58,13 +102,55 @@ def get_pipeline_config() -> dict:
 
 
 def save_pipeline_config(config: dict) -> None:
-    """Persist pipeline config to system_settings."""
-    from ..database import get_supabase_client
+    """
+    Persist pipeline config to system_settings.
+
+    Merged server-side by the ``upsert_pipeline_config`` RPC, so a partial
+    update keeps the other stored keys; falls back to a plain upsert (full
+    replace) only when the function isn't deployed yet. Any other RPC error
+    is raised, since a full replace with a partial body would drop keys.
+    """
+    from ..database import get_supabase_client, is_missing_function
     db = get_supabase_client()
-    db.table("system_settings").upsert(
-        {"key": "pipeline_config", "value": config},
-        on_conflict="key"
-    ).execute()
+    try:
+        db.rpc("upsert_pipeline_config", {"patch": config}).execute()
+    except Exception as e:
+        if not is_missing_function(e):
+            raise
+        logger.warning("upsert_pipeline_config RPC missing; using table upsert", error=str(e)[:200])
+        db.table("system_settings").upsert(
+            {"key": "pipeline_config", "value": config},
+            on_conflict="key"
+        ).execute()
+    invalidate_caches()
+
+
+def invalidate_caches() -> None:
+    """Drop the cached pipeline config and company profile (call after saving either)."""
+    global _CFG_CACHE, _PROFILE_CACHE
+    _CFG_CACHE = None
+    _PROFILE_CACHE = None
+
+
+def _cached_company_profile() -> dict:
+    """``get_company_profile`` behind a TTL; empty results (missing/failed) aren't cached."""
+    global _PROFILE_CACHE
+    now = time.monotonic()
+    if _PROFILE_CACHE is not None and now - _PROFILE_CACHE[0] < _PROFILE_TTL_SECONDS:
+        return _PROFILE_CACHE[1]
+    from ..routers.company_profile import get_company_profile
+    profile = get_company_profile()
+    if profile:
+        _PROFILE_CACHE = (now, profile)
+    return profile
+
+
+def _now_iso() -> str:
+    """UTC now as ISO-8601, reused for up to a second across a pipeline batch."""
+    t = time.monotonic()
+    if t - _NOW_CACHE[0] > 1.0:
+        _NOW_CACHE[:] = [t, datetime.now(timezone.utc).isoformat()]
+    return _NOW_CACHE[1]
 
 
 # ── Core orchestration ────────────────────────────────────────────────────────
@@ -78,7 +164,8 @@ async def run_pipeline(
     Run the pipeline for a single newly-qualified opportunity.
     Returns a dict describing what actions were taken.
     """
-    cfg = get_pipeline_config()
+    # Cache misses hit Supabase with the sync client; keep them off the event loop
+    cfg = await asyncio.to_thread(get_pipeline_config)
     mode = cfg["mode"]
     fit_threshold = cfg["fit_threshold"]
     auto_threshold = cfg["auto_threshold"]
@@ -94,18 +181,15 @@ async def run_pipeline(
     }
 
     if mode == "manual":
-        logger.info("Pipeline: manual mode — no auto-actions", opp_id=opp_id, fit=fit_score)
-        return result
+        return _finish(result, skipped="manual_mode")
 
     # supervised or autonomous: auto-create submission draft for fit ≥ threshold
     if fit_score < fit_threshold:
-        logger.info("Pipeline: fit below threshold — skipping", opp_id=opp_id, fit=fit_score, threshold=fit_threshold)
-        return result
+        return _finish(result, skipped="below_fit_threshold", threshold=fit_threshold)
 
     submission_id = await _auto_create_submission(opportunity, triggered_by_user_id)
     if submission_id:
         result["actions"].append({"type": "submission_created", "submission_id": submission_id})
-        logger.info("Pipeline: draft submission created", opp_id=opp_id, submission_id=submission_id)
 
     # autonomous: also auto-generate proposal for very high fit + small contracts
     if (
@@ -116,84 +200,172 @@ async def run_pipeline(
     ):
         try:
             from ..ai.proposal_generator import generate_full_proposal
-            from ..routers.company_profile import get_company_profile
 
-            profile = get_company_profile()
+            profile = await asyncio.to_thread(_cached_company_profile)
 
             # Generate and persist sections
-            from ..database import get_supabase_client
+            from ..database import get_supabase_client, execute_async
             sections = await generate_full_proposal(opportunity, profile)
             db = get_supabase_client()
-            db.table("submissions").update(
+            await execute_async(db.table("submissions").update(
                 {"proposal_sections": sections}
-            ).eq("id", submission_id).execute()
+            ).eq("id", submission_id))
 
             result["actions"].append({"type": "proposal_generated", "submission_id": submission_id})
-            logger.info("Pipeline: proposal auto-generated", opp_id=opp_id, submission_id=submission_id)
         except Exception as e:
             logger.warning("Pipeline: proposal generation failed", opp_id=opp_id, error=str(e)[:200])
 
+    return _finish(result, submission_id=submission_id)
+
+
+def _finish(result: dict, **extra) -> dict:
+    """Emit the single per-opportunity pipeline log line and pass the result through."""
+    logger.info(
+        "Pipeline finished",
+        opp_id=result["opportunity_id"],
+        mode=result["mode"],
+        fit=result["fit_score"],
+        actions=[a["type"] for a in result["actions"]],
+        **extra,
+    )
     return result
 
 
+async def run_pipeline_batch(
+    items: list[tuple[dict, float]],
+    triggered_by_user_id: Optional[str] = None,
+    concurrency: int = _PIPELINE_CONCURRENCY,
+) -> list[dict]:
+    """
+    Run the pipeline for many ``(opportunity, fit_score)`` pairs concurrently.
+    Failures are logged and skipped; returns the results of the runs that completed.
+    """
+    if not items:
+        return []
+
+    # Warm the config cache once instead of every run racing to fill it
+    await asyncio.to_thread(get_pipeline_config)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _run_one(opportunity: dict, fit_score: float) -> dict:
+        async with sem:
+            return await run_pipeline(opportunity, fit_score, triggered_by_user_id)
+
+    outcomes = await asyncio.gather(
+        *(_run_one(opp, fit) for opp, fit in items), return_exceptions=True
+    )
+
+    results = []
+    for (opp, _), outcome in zip(items, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning("Pipeline orchestration failed", opp_id=opp.get("id"), error=str(outcome)[:200])
+        else:
+            results.append(outcome)
+
+    logger.info(
+        "Pipeline batch complete",
+        total=len(items),
+        failed=len(items) - len(results),
+        actions=sum(len(r["actions"]) for r in results),
+    )
+    return results
+
+
 async def _auto_create_submission(opportunity: dict, user_id: Optional[str]) -> Optional[str]:
     """
     Create a draft submission for the opportunity.
     Returns the submission id, or None on failure.
+
+    Uses the ``auto_create_submission`` RPC (one atomic round-trip); falls back
+    to individual table calls only when the function isn't deployed yet; any
+    other RPC error fails the run rather than risking a duplicate draft.
     """
-    from ..database import get_supabase_client
+    from ..database import get_supabase_client, execute_async, is_missing_function
 
     try:
         db = get_supabase_client()
         opp_id = opportunity.get("id")
 
-        # Check if a submission already exists for this opportunity
-        existing = db.table("submissions").select("id").eq("opportunity_id", opp_id).execute()
-        if existing.data:
-            return existing.data[0]["id"]  # already pursued
+        source = opportunity.get("source") or ""
+        portal = "SAM.gov" if source in _SAM_SOURCES else (source or "unknown")
+        now = _now_iso()
+        submission = {
+            "title": opportunity.get("title", "Auto-draft"),
+            "portal": portal,
+            "due_date": opportunity.get("due_date", now),
+            "notes": f"Auto-created by pipeline orchestrator (fit={opportunity.get('fit_score', '?')})",
+        }
 
-        # Find the first admin/officer to assign as owner
-        owner_id = user_id
-        if not owner_id:
-            admins = db.table("profiles").select("id").in_(
-                "role", ["admin", "contract_officer"]
-            ).limit(1).execute()
-            owner_id = admins.data[0]["id"] if admins.data else None
+        try:
+            rpc = await execute_async(db.rpc("auto_create_submission", {
+                "p_opportunity_id": opp_id,
+                "p_owner_id": user_id,
+                "p_title": submission["title"],
+                "p_portal": submission["portal"],
+                "p_due_date": submission["due_date"],
+                "p_notes": submission["notes"],
+            }))
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            logger.warning("auto_create_submission RPC missing; using table calls", error=str(e)[:200])
+            return await _auto_create_submission_tables(db, opp_id, user_id, submission)
 
-        if not owner_id:
+        if not rpc.data:
             logger.warning("Pipeline: no owner found for auto-submission", opp_id=opp_id)
             return None
+        return rpc.data
 
-        portal = "SAM.gov" if opportunity.get("source", "").lower() == "sam" else (opportunity.get("source") or "unknown")
-        now = datetime.now(timezone.utc).isoformat()
+    except Exception as e:
+        logger.error("Pipeline: failed to auto-create submission", error=str(e)[:300])
+        return None
 
-        sub = db.table("submissions").insert({
-            "opportunity_id": opp_id,
-            "owner_id": owner_id,
-            "title": opportunity.get("title", "Auto-draft"),
-            "portal": portal,
-            "due_date": opportunity.get("due_date", now),
-            "status": "draft",
-            "notes": f"Auto-created by pipeline orchestrator (fit={opportunity.get('fit_score', '?')})",
-        }).execute()
 
-        if not sub.data:
-            return None
+async def _default_owner_id(db) -> Optional[str]:
+    """First admin/officer profile, to own auto-drafts."""
+    from ..database import execute_async
 
-        submission_id = sub.data[0]["id"]
+    admins = await execute_async(
+        db.table("profiles").select("id").in_("role", ["admin", "contract_officer"]).limit(1)
+    )
+    return admins.data[0]["id"] if admins.data else None
 
-        # Create default tasks
-        default_tasks = [
-            {"submission_id": submission_id, "title": "Complete Checklist", "subtitle": "Review and complete all required fields"},
-            {"submission_id": submission_id, "title": "Upload Documents", "subtitle": "Attach all required documents"},
-            {"submission_id": submission_id, "title": "Legal Review", "subtitle": "Obtain legal department approval", "locked": True},
-            {"submission_id": submission_id, "title": "Finance Review", "subtitle": "Obtain finance department approval", "locked": True},
-            {"submission_id": submission_id, "title": "Final Review", "subtitle": "Complete final review before submission", "locked": True},
-        ]
-        db.table("submission_tasks").insert(default_tasks).execute()
 
-        return submission_id
+async def _auto_create_submission_tables(db, opp_id: Optional[str], user_id: Optional[str], submission: dict) -> Optional[str]:
+    """Non-atomic fallback for ``_auto_create_submission`` (pre-migration databases)."""
+    from ..database import execute_async
 
-    except Exception as e:
-        logger.error("Pipeline: failed to auto-create submission", error=str(e)[:300])
+    # The duplicate check and the owner lookup are independent: issue both at once
+    existing_query = db.table("submissions").select("id").eq("opportunity_id", opp_id)
+    if user_id:
+        existing = await execute_async(existing_query)
+        owner_id = user_id
+    else:
+        existing, owner_id = await asyncio.gather(
+            execute_async(existing_query), _default_owner_id(db)
+        )
+
+    if existing.data:
+        return existing.data[0]["id"]  # already pursued
+
+    if not owner_id:
+        logger.warning("Pipeline: no owner found for auto-submission", opp_id=opp_id)
         return None
+
+    sub = await execute_async(db.table("submissions").insert({
+        "opportunity_id": opp_id,
+        "owner_id": owner_id,
+        "status": "draft",
+        **submission,
+    }))
+
+    if not sub.data:
+        return None
+
+    submission_id = sub.data[0]["id"]
+
+    # Create default tasks
+    default_tasks = [{"submission_id": submission_id, **task} for task in _DEFAULT_TASK_TEMPLATES]
+    await execute_async(db.table("submission_tasks").insert(default_tasks))
+
+    return submission_id
@@ -6,10 +6,12 @@ Usage:
     cd procura-ops-command
     python scripts/generate_keys.py
 """
+import base64
 import secrets
-from cryptography.fernet import Fernet
 
-vault_key = Fernet.generate_key().decode()
+# A Fernet key is 32 random bytes, urlsafe-base64 encoded; same as
+# Fernet.generate_key() without importing cryptography.
+vault_key = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode()
 audit_key = secrets.token_hex(32)
 
 print("=" * 60)
@@ -0,0 +1,9 @@
+-- Migration: Record which algorithm signed each audit log
+-- NULL means the legacy HMAC-SHA256 signature; new rows use 'blake2b-256'.
+-- Gracefully skips if column already exists.
+
+ALTER TABLE audit_logs
+ADD COLUMN IF NOT EXISTS signature_alg TEXT;
+
+COMMENT ON COLUMN audit_logs.signature_alg IS
+  'Algorithm used for confirmation_hash: NULL (legacy HMAC-SHA256) or blake2b-256 (keyed BLAKE2b, 32-byte digest). Part of the signed payload.';
@@ -0,0 +1,34 @@
+-- Migration: Atomic bulk upsert for discovered opportunities
+-- One round-trip per batch instead of SELECT + INSERT/UPDATE per record.
+-- Returns each written row plus whether it was newly inserted (xmax = 0 on
+-- the inserted tuple), so callers don't need a follow-up lookup.
+-- Keys in the payload that aren't opportunities columns are ignored.
+
+CREATE OR REPLACE FUNCTION bulk_upsert_opportunities(p JSONB)
+RETURNS TABLE (inserted BOOLEAN, opportunity JSONB)
+LANGUAGE sql
+AS $$
+  INSERT INTO opportunities AS o (
+    external_ref, source, title, agency, description, naics_code, set_aside,
+    posted_date, due_date, estimated_value, raw_data
+  )
+  SELECT
+    r.external_ref, r.source, r.title, r.agency, r.description, r.naics_code, r.set_aside,
+    r.posted_date, r.due_date, r.estimated_value, r.raw_data
+  FROM jsonb_populate_recordset(NULL::opportunities, p) AS r
+  ON CONFLICT (external_ref) DO UPDATE SET
+    source = EXCLUDED.source,
+    title = EXCLUDED.title,
+    agency = EXCLUDED.agency,
+    description = EXCLUDED.description,
+    naics_code = EXCLUDED.naics_code,
+    set_aside = EXCLUDED.set_aside,
+    posted_date = EXCLUDED.posted_date,
+    due_date = EXCLUDED.due_date,
+    estimated_value = EXCLUDED.estimated_value,
+    raw_data = EXCLUDED.raw_data
+  RETURNING (o.xmax = 0), to_jsonb(o.*);
+$$;
+
+COMMENT ON FUNCTION bulk_upsert_opportunities(JSONB) IS
+  'Upsert a JSON array of normalized opportunities on external_ref. Returns (inserted, opportunity) per row.';
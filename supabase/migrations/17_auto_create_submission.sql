@@ -0,0 +1,61 @@
+-- Migration: Atomic draft-submission creation for the pipeline orchestrator
+-- Replaces four round-trips (existing-submission check, owner lookup,
+-- submission insert, default-task insert) with one call. Locking the
+-- opportunity row serializes concurrent pipeline runs for the same
+-- opportunity, so two workers can't both create a draft.
+-- Returns the (new or existing) submission id, or NULL when no owner is given
+-- and no admin/contract_officer profile exists.
+
+CREATE OR REPLACE FUNCTION auto_create_submission(
+  p_opportunity_id UUID,
+  p_owner_id UUID,
+  p_title TEXT,
+  p_portal TEXT,
+  p_due_date DATE,
+  p_notes TEXT
+)
+RETURNS UUID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_owner_id UUID := p_owner_id;
+  v_submission_id UUID;
+BEGIN
+  PERFORM 1 FROM opportunities WHERE id = p_opportunity_id FOR UPDATE;
+
+  SELECT id INTO v_submission_id
+  FROM submissions
+  WHERE opportunity_id = p_opportunity_id
+  LIMIT 1;
+  IF v_submission_id IS NOT NULL THEN
+    RETURN v_submission_id;  -- already pursued
+  END IF;
+
+  IF v_owner_id IS NULL THEN
+    SELECT id INTO v_owner_id
+    FROM profiles
+    WHERE role IN ('admin', 'contract_officer')
+    LIMIT 1;
+  END IF;
+  IF v_owner_id IS NULL THEN
+    RETURN NULL;
+  END IF;
+
+  INSERT INTO submissions (opportunity_id, owner_id, title, portal, due_date, status, notes)
+  VALUES (p_opportunity_id, v_owner_id, p_title, p_portal, p_due_date, 'draft', p_notes)
+  RETURNING id INTO v_submission_id;
+
+  INSERT INTO submission_tasks (submission_id, title, subtitle, locked)
+  VALUES
+    (v_submission_id, 'Complete Checklist', 'Review and complete all required fields', FALSE),
+    (v_submission_id, 'Upload Documents', 'Attach all required documents', FALSE),
+    (v_submission_id, 'Legal Review', 'Obtain legal department approval', TRUE),
+    (v_submission_id, 'Finance Review', 'Obtain finance department approval', TRUE),
+    (v_submission_id, 'Final Review', 'Complete final review before submission', TRUE);
+
+  RETURN v_submission_id;
+END;
+$$;
+
+COMMENT ON FUNCTION auto_create_submission(UUID, UUID, TEXT, TEXT, DATE, TEXT) IS
+  'Create a draft submission plus default tasks for an opportunity unless one exists. Returns the submission id.';
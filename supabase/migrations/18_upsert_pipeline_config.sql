@@ -0,0 +1,19 @@
+-- Migration: Server-side merge for pipeline_config updates
+-- Merges a (possibly partial) JSON patch into system_settings.pipeline_config
+-- in one statement, creating the row if it doesn't exist. Keys absent from
+-- the patch keep their stored values. Returns the merged config.
+
+CREATE OR REPLACE FUNCTION upsert_pipeline_config(patch JSONB)
+RETURNS JSONB
+LANGUAGE sql
+AS $$
+  INSERT INTO system_settings AS s (key, value)
+  VALUES ('pipeline_config', patch)
+  ON CONFLICT (key) DO UPDATE SET
+    value = s.value || EXCLUDED.value,
+    updated_at = NOW()
+  RETURNING s.value;
+$$;
+
+COMMENT ON FUNCTION upsert_pipeline_config(JSONB) IS
+  'Shallow-merge a JSON patch into the pipeline_config setting. Returns the merged value.';